@@ -16,17 +16,19 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import logging
 import os
 from dotenv import load_dotenv
 
 # Import our E*TRADE modules
 from etrade_simple_api import ETradeSimpleAPI
-from portfolio_analyzer import PortfolioAnalyzer, PortfolioPosition
-from main import transform_etrade_position
+from portfolio_analyzer import PortfolioAnalyzer
+from response_cache import ResponseCache
+from main import transform_etrade_positions
 from balance_history import BalanceHistoryReconstructor
 from concentration_analyzer import ConcentrationAnalyzer
-import yaml
 
 def format_dividend_date(timestamp, highlight_if_soon=False, use_dollar_sign=False):
     """Convert E*TRADE timestamp to readable date format, with optional highlighting."""
@@ -175,6 +177,9 @@ st.markdown("""
 # Load environment variables
 load_dotenv()
 
+# Show the API client's status messages on the console, as plain lines
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
 # Upside-down number mapping for redaction
 UPSIDE_DOWN_DIGITS = {
     '0': '0',
@@ -267,22 +272,19 @@ def load_portfolio_data():
         
         account_key = active_account['accountIdKey']
         
-        # Get balance and positions
-        account_balance = api.get_account_balance(account_key)
-        positions_data = api.get_account_positions(account_key)
+        # Reuse recent responses from disk across restarts (cleared by Refresh Data)
+        settings = PortfolioAnalyzer().settings
+        response_cache = ResponseCache(ttl_seconds=settings.get('cache_ttl_seconds', 300))
+        
+        # Balance and positions are independent, so fetch them concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            balance_future = executor.submit(response_cache.get, 'balance', account_key, api.get_account_balance)
+            positions_future = executor.submit(response_cache.get, 'positions', account_key, api.get_account_positions)
+            account_balance = balance_future.result()
+            positions_data = positions_future.result()
         
         # Transform positions
-        portfolio_data = []
-        if 'AccountPortfolio' in positions_data:
-            portfolio = positions_data['AccountPortfolio']
-            positions_list = portfolio.get('Position', [])
-            if not isinstance(positions_list, list):
-                positions_list = [positions_list]
-            
-            for etrade_position in positions_list:
-                transformed_position = transform_etrade_position(etrade_position)
-                if transformed_position:
-                    portfolio_data.append(transformed_position)
+        portfolio_data = transform_etrade_positions(api.extract_positions(positions_data))
         
         return portfolio_data, account_balance, active_account
         
@@ -294,26 +296,13 @@ def create_bucket_analysis(portfolio_data):
     """Create bucket analysis from portfolio data."""
     analyzer = PortfolioAnalyzer()
     
-    # Convert to PortfolioPosition objects
-    positions = []
-    for pos_data in portfolio_data:
-        bucket = analyzer._find_bucket_for_symbol(pos_data['symbol'], pos_data['description'])
-        position = PortfolioPosition(
-            symbol=pos_data['symbol'],
-            description=pos_data['description'],
-            quantity=pos_data['quantity'],
-            current_price=pos_data['current_price'],
-            market_value=pos_data['market_value'],
-            gain_loss=pos_data['gain_loss'],
-            gain_loss_pct=pos_data['gain_loss_pct'],
-            bucket=bucket
-        )
-        positions.append(position)
+    # Build one DataFrame and assign buckets column-wise
+    positions_df = analyzer.assign_buckets_df(pd.DataFrame(portfolio_data))
     
     # Get bucket allocations
-    buckets = analyzer.calculate_bucket_allocations(positions)
+    buckets = analyzer.calculate_bucket_allocations_df(positions_df)
     
-    return buckets, positions
+    return buckets, positions_df
 
 def main():
     """Main Streamlit application."""
@@ -324,6 +313,7 @@ def main():
 
         if st.button("Refresh Data", type="primary"):
             st.cache_data.clear()
+            ResponseCache().clear()
             st.rerun()
         
         st.markdown("---")
@@ -379,7 +369,7 @@ def main():
     #     margin_utilization = (abs(margin_balance) / net_account_value) * 100
     
     # Analyze buckets
-    buckets, positions = create_bucket_analysis(portfolio_data)
+    buckets, positions_df = create_bucket_analysis(portfolio_data)
 
     # Top row - three panes: Balances (25%) | Portfolio Distribution (25%) | Cash Flow (50%)
     col1, col2, col3 = st.columns([1, 1, 2])
@@ -614,13 +604,9 @@ def main():
     # Bottom pane - Positions organized by buckets
     search_term = None # st.text_input("Search positions", placeholder="Search positions...", label_visibility="collapsed")
     
-    # Create analyzer and organize positions by bucket
-    analyzer = PortfolioAnalyzer()
-    
-    # Group positions by bucket
+    # Group positions by bucket, reusing the buckets assigned above
     bucket_positions = {}
-    for pos in portfolio_data:
-        bucket = analyzer._find_bucket_for_symbol(pos['symbol'], pos['description'])
+    for pos, bucket in zip(portfolio_data, positions_df['bucket']):
         if bucket not in bucket_positions:
             bucket_positions[bucket] = []
         bucket_positions[bucket].append(pos)
@@ -727,10 +713,9 @@ def main():
     st.markdown("<span style='color:#888; font-size: 1.1rem;'>Portfolio Concentration Analysis</span>", unsafe_allow_html=True)
     st.markdown("")
     
-    # Load config and create concentration analyzer
+    # Load config (shared with the bucket analysis) and create concentration analyzer
     try:
-        with open('config.yml', 'r') as f:
-            config = yaml.safe_load(f)
+        config = PortfolioAnalyzer().config
         
         concentration_analyzer = ConcentrationAnalyzer(config)
         top_n = config.get('settings', {}).get('top_concentrations', 10)
@@ -742,21 +727,21 @@ def main():
             # Create dataframe for concentration table
             concentration_data = []
             for item in concentrations:
-                # Determine primary symbols contributing to this concentration
-                symbols = sorted(
-                    set(pos['symbol'] for pos in item.contributing_positions),
-                    key=lambda s: sum(p['exposure_value'] for p in item.contributing_positions if p['symbol'] == s),
-                    reverse=True
-                )
+                # Determine primary symbols contributing to this concentration,
+                # totalling exposure and collecting factors per symbol in one pass
+                symbol_totals = {}
+                symbol_factors = {}
+                for p in item.contributing_positions:
+                    symbol = p['symbol']
+                    symbol_totals[symbol] = symbol_totals.get(symbol, 0) + p['exposure_value']
+                    symbol_factors.setdefault(symbol, set()).add(p['factor'])
+                symbols = sorted(symbol_totals, key=symbol_totals.__getitem__, reverse=True)
                 
                 # Create symbol list with exposure details
                 symbol_details = []
                 for symbol in symbols[:5]:  # Show top 5 contributing symbols
-                    symbol_positions = [p for p in item.contributing_positions if p['symbol'] == symbol]
-                    total_symbol_exposure = sum(p['exposure_value'] for p in symbol_positions)
-                    
                     # Get factor info
-                    factors = set(p['factor'] for p in symbol_positions)
+                    factors = symbol_factors[symbol]
                     if len(factors) == 1 and list(factors)[0] != 1.0:
                         factor_text = f" ({list(factors)[0]:.2f}x)"
                     else:
@@ -1,17 +1,83 @@
 #!/usr/bin/env python3
 
+import io
+import logging
 import time
+import binascii
+import functools
+import hashlib
+import hmac
 import requests
 import urllib.parse
-import json
 import os
+import random
 import webbrowser
-from requests_oauthlib import OAuth1Session
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from oauthlib.oauth1 import Client as OAuth1Client, SIGNATURE_HMAC_SHA1
+from oauthlib.oauth1.rfc5849.utils import escape
+from requests.adapters import HTTPAdapter
+from requests_oauthlib import OAuth1, OAuth1Session
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.util.retry import Retry
 from typing import Dict, List, Any, Optional
 import xml.etree.ElementTree as ET
 
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=8)
+def _hmac_sha1_template(client_secret: str, resource_owner_secret: str) -> hmac.HMAC:
+    """Build an HMAC-SHA1 state keyed with the OAuth signing key, to be copied per request."""
+    key = f"{escape(client_secret)}&{escape(resource_owner_secret)}"
+    return hmac.new(key.encode('utf-8'), digestmod=hashlib.sha1)
+
+
+def _sign_hmac_sha1_presigned(base_string: str, client: OAuth1Client) -> str:
+    """HMAC-SHA1 OAuth signature that reuses the keyed state instead of re-deriving it."""
+    signature = _hmac_sha1_template(client.client_secret or '', client.resource_owner_secret or '').copy()
+    signature.update(base_string.encode('utf-8'))
+    return binascii.b2a_base64(signature.digest())[:-1].decode('utf-8')
+
+
+class _PresignedOAuth1Client(OAuth1Client):
+    """oauthlib client whose HMAC-SHA1 signer skips the per-request key setup."""
+    SIGNATURE_METHODS = {**OAuth1Client.SIGNATURE_METHODS, SIGNATURE_HMAC_SHA1: _sign_hmac_sha1_presigned}
+
+
+class _JitteredRetry(Retry):
+    """Retry policy that adds up to a second of random jitter to the exponential backoff."""
+    
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        return backoff + random.random() if backoff else backoff
+
 
 class ETradeSimpleAPI:
+    # Fixed attribute layout: no per-instance __dict__, and attribute reads are slot lookups
+    __slots__ = (
+        'client_key', 'client_secret', 'use_sandbox', 'base_url', 'auth_base_url', 'token_file',
+        'access_token', 'access_token_secret', 'token_timestamp', 'last_validated_at',
+        '_accounts_cache', '_accounts_cached_at', '_accounts_by_key',
+        '_http_adapter', '_session', '_oauth_auth',
+    )
+    
+    # Seconds a successful token validation is trusted before probing the API again
+    TOKEN_VALIDATION_TTL = 600
+    # Cached tokens older than this are discarded without being validated
+    TOKEN_MAX_AGE_HOURS = 12
+    # (connect, read) timeout in seconds for every API request
+    REQUEST_TIMEOUT = (5, 30)
+    # Tighter (connect, read) timeout for the startup token check
+    VALIDATION_TIMEOUT = (2, 5)
+    # Seconds a fetched account list is reused before asking the API again
+    ACCOUNT_LIST_TTL = 300
+    # GETs answered with one of these statuses (or cut off mid-response) are re-sent,
+    # up to MAX_RETRIES times with jittered exponential backoff
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    MAX_RETRIES = 3
+    RETRY_BACKOFF_FACTOR = 1
+    
     def __init__(self, client_key: str, client_secret: str, use_sandbox: bool = False):
         self.client_key = client_key
         self.client_secret = client_secret
@@ -25,6 +91,36 @@ class ETradeSimpleAPI:
         # OAuth tokens
         self.access_token: str = ''
         self.access_token_secret: str = ''
+        self.token_timestamp: float = 0.0
+        self.last_validated_at: float = 0.0
+        
+        # Account list rarely changes; reuse it across calls (see get_account_list)
+        self._accounts_cache: Optional[Dict[str, Any]] = None
+        self._accounts_cached_at: float = 0.0
+        self._accounts_by_key: Dict[str, Dict[str, Any]] = {}
+        
+        # Shared transport: keeps one connection pool for every OAuth session created
+        # by this client. Only two hosts are ever hit (api + auth); keep enough warm
+        # connections per host for the concurrent fetches to run without opening new
+        # TLS sessions.
+        # The adapter only retries failed connects: nothing was sent, so resending
+        # the already-signed request is safe. Anything that reached the server must
+        # be re-signed with a fresh nonce and timestamp, so safe_request retries
+        # read errors and retryable statuses itself
+        self._http_adapter = HTTPAdapter(pool_connections=2, pool_maxsize=10, max_retries=_JitteredRetry(
+            total=self.MAX_RETRIES,
+            connect=self.MAX_RETRIES,
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=self.RETRY_BACKOFF_FACTOR,
+            raise_on_status=False  # Hand error responses back to safe_request
+        ))
+        
+        # One pooled session for all API calls, signed with a reusable OAuth1 auth
+        self._session = requests.Session()
+        self._session.mount('https://', self._http_adapter)
+        self._oauth_auth: Optional[OAuth1] = None
         
         # Load cached tokens on initialization
         self._load_tokens()
@@ -33,8 +129,8 @@ class ETradeSimpleAPI:
         """Load access tokens from cache file if they exist and are not expired."""
         try:
             if os.path.exists(self.token_file):
-                with open(self.token_file, 'r') as f:
-                    token_data = json.load(f)
+                with open(self.token_file, 'rb') as f:
+                    token_data = orjson.loads(f.read())
                     
                     # Check if tokens match our current configuration
                     if (token_data.get('client_key') == self.client_key and 
@@ -45,114 +141,212 @@ class ETradeSimpleAPI:
                         age_hours = (time.time() - timestamp) / 3600
 
                         # Don't reject based on age alone - let validation check if they still work
-                        if age_hours > 12:  # Only reject if extremely old (12+ hours)
-                            print(f"⚠️  Cached tokens are {age_hours:.1f} hours old, considered expired")
+                        if age_hours > self.TOKEN_MAX_AGE_HOURS:  # Only reject if extremely old
+                            logger.warning("⚠️  Cached tokens are %.1f hours old, considered expired", age_hours)
                             return
                             
                         self.access_token = token_data.get('access_token', '')
                         self.access_token_secret = token_data.get('access_token_secret', '')
-                        print(f"✅ Loaded cached tokens for {'sandbox' if self.use_sandbox else 'production'} (age: {age_hours:.1f}h)")
+                        self.token_timestamp = timestamp
+                        self.last_validated_at = token_data.get('last_validated_at', 0.0)
+                        logger.info("✅ Loaded cached tokens for %s (age: %.1fh)",
+                                    'sandbox' if self.use_sandbox else 'production', age_hours)
         except Exception as e:
-            print(f"Warning: Could not load cached tokens: {e}")
+            logger.warning("Warning: Could not load cached tokens: %s", e)
     
     def _save_tokens(self) -> None:
-        """Save access tokens to cache file with expiration info."""
+        """Save freshly issued access tokens to cache file with expiration info."""
         try:
-            current_time = time.time()
-            # E*TRADE tokens typically expire after 2 hours
-            expires_at = current_time + (2 * 3600)  # 2 hours from now
-            
-            token_data = {
-                'client_key': self.client_key,
-                'use_sandbox': self.use_sandbox,
-                'access_token': self.access_token,
-                'access_token_secret': self.access_token_secret,
-                'timestamp': current_time,
-                'expires_at': expires_at,
-                'expires_in_hours': 2.0
-            }
-            with open(self.token_file, 'w') as f:
-                json.dump(token_data, f, indent=2)
-            print(f"✅ Cached tokens saved to {self.token_file} (expires in ~2 hours)")
+            # Newly issued tokens are valid by definition
+            self.token_timestamp = self.last_validated_at = time.time()
+            self._write_token_file()
+            logger.info("✅ Cached tokens saved to %s (expires in ~2 hours)", self.token_file)
         except Exception as e:
-            print(f"Warning: Could not save tokens: {e}")
+            logger.warning("Warning: Could not save tokens: %s", e)
+    
+    def _write_token_file(self) -> None:
+        """Write the current tokens and their timestamps to the cache file."""
+        # E*TRADE tokens typically expire after 2 hours
+        expires_at = self.token_timestamp + (2 * 3600)  # 2 hours after issue
+        
+        token_data = {
+            'client_key': self.client_key,
+            'use_sandbox': self.use_sandbox,
+            'access_token': self.access_token,
+            'access_token_secret': self.access_token_secret,
+            'timestamp': self.token_timestamp,
+            'expires_at': expires_at,
+            'expires_in_hours': 2.0,
+            'last_validated_at': self.last_validated_at
+        }
+        # Write to a temp file and swap it in so readers never see a partial file
+        tmp_file = self.token_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(orjson.dumps(token_data, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_file, self.token_file)
     
     def clear_tokens(self) -> None:
         """Clear cached tokens and delete cache file."""
         self.access_token = ''
         self.access_token_secret = ''
+        self.token_timestamp = 0.0
+        self.last_validated_at = 0.0
+        self._oauth_auth = None
+        self._accounts_cache = None
+        self._accounts_by_key = {}
         try:
             if os.path.exists(self.token_file):
                 os.remove(self.token_file)
-                print(f"✅ Token cache cleared")
+                logger.info("✅ Token cache cleared")
         except Exception as e:
-            print(f"Warning: Could not clear token cache: {e}")
+            logger.warning("Warning: Could not clear token cache: %s", e)
     
     def is_authenticated(self) -> bool:
         """Check if we have valid access tokens."""
         return bool(self.access_token and self.access_token_secret)
     
     def validate_tokens(self) -> bool:
-        """Validate that cached tokens are still valid by making a test API call."""
+        """Validate that cached tokens are still valid by making a test API call.
+        
+        A successful validation is trusted for TOKEN_VALIDATION_TTL seconds, so
+        reruns shortly after authenticating don't need a network round-trip.
+        """
         if not self.is_authenticated():
             return False
         
+        if time.time() - self.last_validated_at < self.TOKEN_VALIDATION_TTL:
+            return True
+        
         try:
-            # Make a simple API call to test token validity
-            session = OAuth1Session(
-                self.client_key,
-                client_secret=self.client_secret,
-                resource_owner_key=self.access_token,
-                resource_owner_secret=self.access_token_secret,
-                signature_method='HMAC-SHA1'
-            )
-            
-            # Use the account list endpoint as a validation test
+            # Use the account list endpoint as a validation test; only the status
+            # matters, so try HEAD first and never download the account list itself
             url = f"{self.base_url}/v1/accounts/list"
-            response = session.get(url)
+            auth = self._access_auth()
+            response = self.safe_request(self._session, 'HEAD', url, auth=auth,
+                                         timeout=self.VALIDATION_TIMEOUT, allow_redirects=False)
+            if response.status_code not in (200, 401):
+                # Only a 401 says anything about the tokens; HEAD may be unsupported,
+                # redirected or rejected for other reasons, so confirm with a streamed
+                # GET and peek at the start of its body
+                response.close()
+                response = self.safe_request(self._session, 'GET', url, auth=auth,
+                                             timeout=self.VALIDATION_TIMEOUT, stream=True)
             
-            if response.status_code == 200:
-                return True
-            elif 'token_rejected' in response.text or 'oauth_problem' in response.text:
-                print("⚠️  Cached tokens are invalid or expired")
-                return False
-            else:
-                print(f"⚠️  Token validation returned status {response.status_code}")
+            try:
+                if response.status_code == 200:
+                    self.last_validated_at = time.time()
+                    try:
+                        self._write_token_file()
+                    except Exception as e:
+                        logger.warning("Warning: Could not update token cache: %s", e)
+                    return True
+                
+                head = response.raw.read(256, decode_content=True) or b''
+                if response.status_code == 401 or b'token_rejected' in head or b'oauth_problem' in head:
+                    logger.warning("⚠️  Cached tokens are invalid or expired")
+                else:
+                    logger.warning("⚠️  Token validation returned status %s", response.status_code)
                 return False
+            finally:
+                response.close()
                 
         except Exception as e:
-            print(f"⚠️  Token validation failed: {e}")
+            logger.warning("⚠️  Token validation failed: %s", e)
             return False
     
-    def safe_request(self, session: OAuth1Session, method: str, url: str, max_retries: int = 3, **kwargs) -> requests.Response:
-        """Make a request with retry logic for connection issues."""
-        for attempt in range(max_retries):
+    def _oauth_session(self, **kwargs) -> OAuth1Session:
+        """Create an OAuth session that uses the shared retrying connection pool and signer."""
+        session = OAuth1Session(self.client_key, client_secret=self.client_secret,
+                                client_class=_PresignedOAuth1Client, **kwargs)
+        session.mount('https://', self._http_adapter)
+        return session
+    
+    def _access_auth(self) -> OAuth1:
+        """OAuth1 signer for the current access token, built once and reused across requests."""
+        auth = self._oauth_auth
+        if (auth is None or auth.client.resource_owner_key != self.access_token
+                or auth.client.resource_owner_secret != self.access_token_secret):
+            auth = self._oauth_auth = OAuth1(
+                self.client_key,
+                client_secret=self.client_secret,
+                resource_owner_key=self.access_token,
+                resource_owner_secret=self.access_token_secret,
+                signature_method='HMAC-SHA1',
+                client_class=_PresignedOAuth1Client
+            )
+        return auth
+    
+    @staticmethod
+    def _parse_token_response(text: str) -> Dict[str, str]:
+        """Parse an OAuth token response body (oauth_token=...&oauth_token_secret=...)."""
+        token_data = dict(kv.split('=', 1) for kv in text.split('&') if '=' in kv)
+        # Only the token values are used, so only those need percent-decoding
+        for key in ('oauth_token', 'oauth_token_secret'):
+            if key in token_data:
+                token_data[key] = urllib.parse.unquote(token_data[key])
+        return token_data
+    
+    def safe_request(self, session: requests.Session, method: str, url: str, **kwargs) -> requests.Response:
+        """Make a request with a timeout, retrying transient GET failures.
+        
+        Each retry goes through session.request again, so OAuth signs it anew;
+        E*TRADE may reject a resent nonce. Failed connects have already been
+        retried by the mounted adapter and are not retried again here. After the
+        last attempt the final response (or error) is handed back to the caller.
+        """
+        kwargs.setdefault('timeout', self.REQUEST_TIMEOUT)
+        method = method.upper()
+        retries = self.MAX_RETRIES if method == 'GET' else 0
+        
+        for attempt in range(retries + 1):
+            retry_after = None
             try:
-                if method.upper() == 'GET':
-                    response = session.get(url, **kwargs)
-                    return response
-                elif method.upper() == 'POST':
-                    response = session.post(url, **kwargs)
-                    return response
-            except Exception as e:
-                print(f"  Attempt {attempt + 1} failed: {e}")
-                if attempt < max_retries - 1:
-                    print(f"  Retrying in {2 ** attempt} seconds...")
-                    time.sleep(2 ** attempt)
-                else:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == retries or self._is_connect_failure(e):
                     raise
-        # This should never be reached due to the raise above
+                logger.warning("  Attempt %d failed: %s", attempt + 1, e)
+            else:
+                if attempt == retries or response.status_code not in self.RETRY_STATUSES:
+                    return response
+                logger.warning("  Attempt %d got status %s", attempt + 1, response.status_code)
+                retry_after = self._retry_after_seconds(response)
+                response.close()
+            
+            backoff = self.RETRY_BACKOFF_FACTOR * 2 ** attempt + random.random()
+            time.sleep(max(backoff, retry_after or 0))
+        
+        # Unreachable: the last attempt always returns or raises
         raise Exception("All retry attempts failed")
+    
+    @staticmethod
+    def _is_connect_failure(error: Exception) -> bool:
+        """True if the request never reached the server (already retried by the adapter)."""
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        # requests wraps urllib3's MaxRetryError, whose reason is the underlying failure
+        reason = getattr(error.args[0], 'reason', None) if error.args else None
+        return isinstance(reason, ConnectTimeoutError)  # Includes NewConnectionError
+    
+    def _retry_after_seconds(self, response: requests.Response) -> Optional[float]:
+        """Seconds the server asked us to wait via Retry-After, if it sent a usable value."""
+        header = response.headers.get('Retry-After')
+        if not header:
+            return None
+        try:
+            return self._http_adapter.max_retries.parse_retry_after(header)
+        except Exception:
+            return None  # Malformed header; fall back to the normal backoff
 
     def authenticate(self) -> bool:
         """Perform OAuth authentication with E*TRADE."""
         if self.is_authenticated():
             # Validate that cached tokens still work
             if self.validate_tokens():
-                print("✅ Cached tokens are valid and ready to use")
+                logger.info("✅ Cached tokens are valid and ready to use")
                 return True
             else:
-                print("🔄 Cached tokens expired, clearing cache and re-authenticating...")
+                logger.info("🔄 Cached tokens expired, clearing cache and re-authenticating...")
                 self.clear_tokens()
             
         print("🔐 Starting OAuth authentication...")
@@ -165,7 +359,7 @@ class ETradeSimpleAPI:
         try:
             # Step 1: Get request token
             print("1. Getting request token...")
-            oauth = OAuth1Session(self.client_key, client_secret=self.client_secret, callback_uri='oob')
+            oauth = self._oauth_session(callback_uri='oob')
             
             response = self.safe_request(oauth, 'GET', REQUEST_TOKEN_URL)
             
@@ -174,7 +368,7 @@ class ETradeSimpleAPI:
                 return False
             
             # Parse the response
-            request_token_data = dict(urllib.parse.parse_qsl(response.text))
+            request_token_data = self._parse_token_response(response.text)
             oauth_token = request_token_data['oauth_token']
             oauth_token_secret = request_token_data['oauth_token_secret']
             
@@ -196,11 +390,9 @@ class ETradeSimpleAPI:
             
             # Step 3: Exchange for access token
             print("2. Exchanging for access token...")
-            oauth = OAuth1Session(self.client_key, 
-                                 client_secret=self.client_secret,
-                                 resource_owner_key=oauth_token,
-                                 resource_owner_secret=oauth_token_secret,
-                                 verifier=verifier)
+            oauth = self._oauth_session(resource_owner_key=oauth_token,
+                                        resource_owner_secret=oauth_token_secret,
+                                        verifier=verifier)
             
             response = self.safe_request(oauth, 'GET', ACCESS_TOKEN_URL)
             
@@ -209,7 +401,7 @@ class ETradeSimpleAPI:
                 return False
             
             # Parse access token response
-            access_token_data = dict(urllib.parse.parse_qsl(response.text))
+            access_token_data = self._parse_token_response(response.text)
             access_token = access_token_data.get('oauth_token')
             access_token_secret = access_token_data.get('oauth_token_secret')
             
@@ -235,64 +427,123 @@ class ETradeSimpleAPI:
         
         url = f"{self.base_url}{endpoint}"
         
-        # Create OAuth session with access tokens
-        oauth = OAuth1Session(
-            self.client_key,
-            client_secret=self.client_secret,
-            resource_owner_key=self.access_token,
-            resource_owner_secret=self.access_token_secret
-        )
+        # Ask E*TRADE for JSON so responses can be decoded by orjson instead of walking XML
+        kwargs['headers'] = {'Accept': 'application/json', **kwargs.get('headers', {})}
         
-        return self.safe_request(oauth, method, url, **kwargs)
+        return self.safe_request(self._session, method, url, auth=self._access_auth(), **kwargs)
     
-    def _parse_xml_response(self, response: requests.Response) -> Dict[str, Any]:
-        """Parse XML response and convert to dictionary."""
-        if response.headers.get('content-type', '').startswith('application/xml') or response.text.strip().startswith('<'):
+    def _parse_response(self, response: requests.Response, streamed: bool = False) -> Dict[str, Any]:
+        """Parse a JSON (or legacy XML) response into a dictionary.
+        
+        For responses requested with stream=True, an XML body is parsed directly
+        from the socket instead of being buffered in full first.
+        """
+        if streamed and response.headers.get('content-type', '').startswith(('application/xml', 'text/xml')):
             try:
-                root = ET.fromstring(response.text)
-                return self._xml_to_dict(root)
+                response.raw.decode_content = True
+                result = self._xml_to_dict(response.raw)
             except ET.ParseError as e:
-                print(f"Warning: Could not parse XML response: {e}")
-                return {'raw_text': response.text}
-        else:
-            # Try JSON parsing
+                logger.warning("Warning: Could not parse XML response: %s", e)
+                return {'raw_text': ''}
+            finally:
+                response.close()
+            return result if isinstance(result, dict) else {'raw_text': result}
+        
+        body = response.content
+        if response.headers.get('content-type', '').startswith('application/xml') or body.lstrip().startswith(b'<'):
             try:
-                return response.json()
-            except:
+                result = self._xml_to_dict(io.BytesIO(body))
+            except ET.ParseError as e:
+                logger.warning("Warning: Could not parse XML response: %s", e)
                 return {'raw_text': response.text}
+            return result if isinstance(result, dict) else {'raw_text': result}
+        
+        try:
+            data = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return {'raw_text': response.text}
+        
+        if not isinstance(data, dict):
+            return {'raw_text': response.text}
+        return self._normalize_json(data)
     
-    def _xml_to_dict(self, element: ET.Element) -> Any:
-        """Convert XML element to dictionary or string."""
-        result = {}
-        
-        # Add attributes
-        if element.attrib:
-            result['@attributes'] = element.attrib
-        
-        # Add text content
-        if element.text and element.text.strip():
-            if len(element) == 0:  # Leaf node
-                return element.text.strip()
-            else:
-                result['#text'] = element.text.strip()
+    def _normalize_json(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Give JSON responses the same shape the XML parser produces."""
+        # JSON bodies are wrapped in the response root (e.g. "PortfolioResponse"),
+        # which the XML parser drops along with the root element
+        if len(data) == 1:
+            (root,) = data.values()
+            if isinstance(root, dict):
+                data = root
         
-        # Add child elements
-        for child in element:
-            child_data = self._xml_to_dict(child)
-            if child.tag in result:
+        # A single portfolio comes back as a one-element list in JSON
+        portfolio = data.get('AccountPortfolio')
+        if isinstance(portfolio, list) and len(portfolio) == 1:
+            data['AccountPortfolio'] = portfolio[0]
+        
+        return data
+    
+    def _xml_to_dict(self, source: Any) -> Any:
+        """Convert an XML document to a dictionary or string in a single streaming pass.
+        
+        Elements are converted as soon as they close and then cleared, so the
+        full element tree is never held in memory alongside the result.
+        """
+        # One frame per open element: the dict of its converted children
+        stack: List[Dict[str, Any]] = []
+        result: Any = None
+        
+        for event, element in ET.iterparse(source, events=('start', 'end')):
+            if event == 'start':
+                stack.append({})
+                continue
+            
+            children = stack.pop()
+            text = element.text.strip() if element.text else ''
+            if text and not children:  # Leaf node
+                value: Any = text
+            else:
+                value = {}
+                if element.attrib:
+                    value['@attributes'] = dict(element.attrib)
+                if text:
+                    value['#text'] = text
+                value.update(children)
+            element.clear()
+            
+            if not stack:
+                result = value
+                break
+            
+            parent = stack[-1]
+            if element.tag in parent:
                 # Convert to list if multiple elements with same tag
-                if not isinstance(result[child.tag], list):
-                    result[child.tag] = [result[child.tag]]
-                result[child.tag].append(child_data)
+                if not isinstance(parent[element.tag], list):
+                    parent[element.tag] = [parent[element.tag]]
+                parent[element.tag].append(value)
             else:
-                result[child.tag] = child_data
+                parent[element.tag] = value
         
         return result
 
     def get_account_list(self) -> Dict[str, Any]:
-        """Get list of accounts."""
+        """Get list of accounts, reusing a recent successful response for ACCOUNT_LIST_TTL seconds."""
+        if self._accounts_cache is not None and time.time() - self._accounts_cached_at < self.ACCOUNT_LIST_TTL:
+            return self._accounts_cache
+        
         response = self._make_authenticated_request('GET', '/v1/accounts/list')
-        return self._parse_xml_response(response)
+        accounts = self._parse_response(response)
+        
+        # Only cache real account lists, never error responses
+        if 'Accounts' in accounts:
+            account_list = accounts['Accounts'].get('Account', [])
+            if not isinstance(account_list, list):
+                account_list = [account_list]
+            
+            self._accounts_by_key = {account.get('accountIdKey'): account for account in account_list}
+            self._accounts_cache = accounts
+            self._accounts_cached_at = time.time()
+        return accounts
 
     def get_account_balance(self, account_id_key: str) -> Dict[str, Any]:
         """Get account balance from E*TRADE API with proper parameters."""
@@ -305,53 +556,43 @@ class ETradeSimpleAPI:
         
         try:
             response = self._make_authenticated_request('GET', endpoint, params=params)
-            result = self._parse_xml_response(response)
+            result = self._parse_response(response)
             
             # Check for error responses
             if 'raw_text' in result and 'Internal Server Error' in str(result['raw_text']):
-                print("⚠️  Balance API returned error, using computed method...")
+                logger.warning("⚠️  Balance API returned error, using computed method...")
                 return self.get_account_balance_computed(account_id_key)
             elif 'Computed' not in result or 'accountId' not in result:
-                print(f"⚠️  Unexpected balance response format, keys: {list(result.keys())}")
-                print("Using computed method...")
+                logger.warning("⚠️  Unexpected balance response format, keys: %s", list(result))
+                logger.warning("Using computed method...")
                 return self.get_account_balance_computed(account_id_key)
                 
-            print("✅ Successfully retrieved balance from E*TRADE API")
+            logger.info("✅ Successfully retrieved balance from E*TRADE API")
             return result
             
         except Exception as e:
-            print(f"⚠️  Balance API call failed: {e}, using computed method...")
+            logger.warning("⚠️  Balance API call failed: %s, using computed method...", e)
             return self.get_account_balance_computed(account_id_key)
     
     def get_account_balance_computed(self, account_id_key: str) -> Dict[str, Any]:
         """Get account balance using computed method from positions and account type."""
         try:
-            # Get positions to calculate total portfolio value
-            positions_data = self.get_account_positions(account_id_key)
+            # Positions (for total portfolio value) and the account list (for the
+            # account mode) are independent, so fetch them concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                positions_future = executor.submit(self.get_account_positions, account_id_key)
+                accounts_future = executor.submit(self.get_account_list)
+                positions_data = positions_future.result()
+                accounts = accounts_future.result()
             
-            total_portfolio_value = 0.0
-            if 'AccountPortfolio' in positions_data:
-                portfolio = positions_data['AccountPortfolio']
-                positions_list = portfolio.get('Position', [])
-                if not isinstance(positions_list, list):
-                    positions_list = [positions_list]
-                
-                for pos in positions_list:
-                    market_value = float(pos.get('marketValue', 0))
-                    total_portfolio_value += market_value
+            total_portfolio_value = sum(
+                float(pos.get('marketValue') or 0) for pos in self.extract_positions(positions_data)
+            )
             
-            # Get account info to determine if it's margin account
-            accounts = self.get_account_list()
+            # Use account info to determine if it's margin account
             account_mode = "CASH"  # Default
             if 'Accounts' in accounts:
-                account_list = accounts['Accounts']['Account']
-                if not isinstance(account_list, list):
-                    account_list = [account_list]
-                
-                for account in account_list:
-                    if account.get('accountIdKey') == account_id_key:
-                        account_mode = account.get('accountMode', 'CASH')
-                        break
+                account_mode = self._accounts_by_key.get(account_id_key, {}).get('accountMode', 'CASH')
             
             # Calculate balance based on market values and known account characteristics
             is_margin_account = account_mode == 'MARGIN'
@@ -417,12 +658,19 @@ class ETradeSimpleAPI:
                 }
             
         except Exception as e:
-            print(f"❌ Error computing balance: {e}")
+            logger.error("❌ Error computing balance: %s", e)
             return {
                 'error': str(e),
                 'computed': False
             }
 
+    @staticmethod
+    def extract_positions(positions_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Return the list of positions from a get_account_positions() result."""
+        positions_list = positions_data.get('AccountPortfolio', {}).get('Position', [])
+        # The XML parser yields a bare dict when there is only one position
+        return positions_list if isinstance(positions_list, list) else [positions_list]
+    
     def get_account_positions(self, account_id_key: str) -> Dict[str, Any]:
         """Get account portfolio positions with complete view for detailed information.
         
@@ -437,10 +685,11 @@ class ETradeSimpleAPI:
         params = {
             'view': 'COMPLETE'  # Request complete view for dividend info and detailed data
         }
-        response = self._make_authenticated_request('GET', endpoint, params=params)
-        return self._parse_xml_response(response)
+        # The complete view can be large; stream it so XML bodies are parsed as they arrive
+        response = self._make_authenticated_request('GET', endpoint, params=params, stream=True)
+        return self._parse_response(response, streamed=True)
 
-    def get_account_transactions(self, account_id_key: str, start_date: Optional[str] = None, end_date: Optional[str] = None, count: int = 50, marker: Optional[str] = None) -> Dict[str, Any]:
+    def get_account_transactions(self, account_id_key: str, start_date: Optional[str] = None, end_date: Optional[str] = None, count: int = 50, marker: Optional[str] = None, etag: Optional[str] = None) -> Dict[str, Any]:
         """Get account transactions for historical analysis.
         
         Args:
@@ -449,6 +698,10 @@ class ETradeSimpleAPI:
             end_date: End date in MMDDYYYY format (optional) - e.g., "09302025" for Sept 30, 2025  
             count: Number of transactions to retrieve (max 50 per call)
             marker: Transaction ID to start from for pagination (optional)
+            etag: ETag of an earlier identical request (optional). If the server answers
+                  304 Not Modified, returns {'notModified': True} without a body.
+        
+        The response's ETag, if the server sends one, is returned under 'etag'.
         """
         # Use the correct E*TRADE transactions endpoint (plural "accounts")
         endpoint = f'/v1/accounts/{account_id_key}/transactions'
@@ -460,6 +713,45 @@ class ETradeSimpleAPI:
             params['endDate'] = end_date
         if marker:
             params['marker'] = marker
+        
+        headers = {'If-None-Match': etag} if etag else {}
+        response = self._make_authenticated_request('GET', endpoint, params=params, headers=headers)
+        if response.status_code == 304:
+            return {'notModified': True}
+        
+        result = self._parse_response(response)
+        if response.headers.get('ETag'):
+            result['etag'] = response.headers['ETag']
+        return result
+    
+    def get_all_account_transactions(self, account_id_key: str, start_date: Optional[str] = None, end_date: Optional[str] = None, max_pages: int = 50) -> List[Dict[str, Any]]:
+        """Get every transaction in a date range by following the pagination marker.
+        
+        E*TRADE's marker is an opaque cursor returned with each page, so pages have
+        to be requested one after another; this drains them in a single call.
+        
+        Args:
+            account_id_key: Account identifier
+            start_date: Start date in MMDDYYYY format (optional)
+            end_date: End date in MMDDYYYY format (optional)
+            max_pages: Safety limit on the number of pages requested
+        """
+        transactions: List[Dict[str, Any]] = []
+        marker = None
+        
+        for _ in range(max_pages):
+            page = self.get_account_transactions(account_id_key, start_date=start_date, end_date=end_date, marker=marker)
             
-        response = self._make_authenticated_request('GET', endpoint, params=params)
-        return self._parse_xml_response(response)
\ No newline at end of file
+            page_transactions = page.get('Transaction', [])
+            if not isinstance(page_transactions, list):
+                page_transactions = [page_transactions]
+            transactions.extend(page_transactions)
+            
+            # moreTransactions is a bool in JSON responses and a string in XML ones
+            more = str(page.get('moreTransactions', '')).lower() == 'true'
+            next_marker = page.get('marker')
+            if not page_transactions or not more or not next_marker or next_marker == marker:
+                break
+            marker = next_marker
+        
+        return transactions
@@ -6,40 +6,43 @@ This module provides utility functions for transforming E*TRADE API data.
 Used by dashboard.py for the Streamlit visualization.
 
 The transform_etrade_position function converts E*TRADE API position format
-to a standardized dictionary format with dividend information.
+to a standardized dictionary format with dividend information, and
+transform_etrade_positions does the same for a whole portfolio at once.
 """
 
+from typing import List
+
+import numpy as np
+
 
 def transform_etrade_position(etrade_position: dict) -> dict:
     """Transform E*TRADE position data to expected dictionary format with dividend info."""
     try:
-        # Extract basic position info
-        symbol = etrade_position.get('symbolDescription', '')
-        quantity = float(etrade_position.get('quantity', 0))
-        market_value = float(etrade_position.get('marketValue', 0))
-        total_gain = float(etrade_position.get('totalGain', 0))
-        total_gain_pct = float(etrade_position.get('totalGainPct', 0))
+        # Bind lookups locally; missing or empty fields count as zero
+        get = etrade_position.get
+        _float = float
         
-        # Get current price from Quick quote data
-        quick_data = etrade_position.get('Quick', {})
-        current_price = float(quick_data.get('lastTrade', 0))
-        
-        # If no current price in Quick, calculate from market value and quantity
-        if current_price == 0 and quantity > 0:
-            current_price = market_value / quantity
+        # Extract basic position info
+        symbol = get('symbolDescription', '')
+        quantity = _float(get('quantity', 0) or 0)
+        market_value = _float(get('marketValue', 0) or 0)
+        total_gain = _float(get('totalGain', 0) or 0)
+        total_gain_pct = _float(get('totalGainPct', 0) or 0)
         
-
+        # Get current price from Quick quote data, or calculate it from market value and quantity
+        current_price = _float(get('Quick', {}).get('lastTrade', 0) or 0)
+        current_price = current_price or (market_value / quantity if quantity > 0 else 0.0)
         
         # Extract dividend information from Complete section (available with complete view)
-        complete_data = etrade_position.get('Complete', {})
-        annual_dividend = float(complete_data.get('annualDividend', 0))
-        dividend = float(complete_data.get('dividend', 0))
-        div_yield = float(complete_data.get('divYield', 0))
-        div_pay_date = complete_data.get('divPayDate', '')
-        ex_dividend_date = complete_data.get('exDividendDate', '')
+        complete_get = get('Complete', {}).get
+        annual_dividend = _float(complete_get('annualDividend', 0) or 0)
+        dividend = _float(complete_get('dividend', 0) or 0)
+        div_yield = _float(complete_get('divYield', 0) or 0)
+        div_pay_date = complete_get('divPayDate', '')
+        ex_dividend_date = complete_get('exDividendDate', '')
         
         # Calculate annual dividend income from this position
-        annual_dividend_income = annual_dividend * quantity if annual_dividend > 0 else 0
+        annual_dividend_income = annual_dividend * quantity if annual_dividend > 0 else 0.0
             
         return {
             'symbol': symbol,
@@ -70,3 +73,64 @@ def transform_etrade_position(etrade_position: dict) -> dict:
         }
 
 
+def _numeric_column(etrade_positions: List[dict], section: str, field: str) -> np.ndarray:
+    """Extract one numeric field from every position into a float64 array."""
+    if section:
+        values = (float(pos.get(section, {}).get(field, 0) or 0) for pos in etrade_positions)
+    else:
+        values = (float(pos.get(field, 0) or 0) for pos in etrade_positions)
+    return np.fromiter(values, dtype=np.float64, count=len(etrade_positions))
+
+
+def transform_etrade_positions(etrade_positions: List[dict]) -> List[dict]:
+    """Transform all E*TRADE positions at once, computing derived values column-wise."""
+    if not etrade_positions:
+        return []
+    
+    try:
+        quantity = _numeric_column(etrade_positions, '', 'quantity')
+        market_value = _numeric_column(etrade_positions, '', 'marketValue')
+        total_gain = _numeric_column(etrade_positions, '', 'totalGain')
+        total_gain_pct = _numeric_column(etrade_positions, '', 'totalGainPct')
+        last_trade = _numeric_column(etrade_positions, 'Quick', 'lastTrade')
+        annual_dividend = _numeric_column(etrade_positions, 'Complete', 'annualDividend')
+        dividend = _numeric_column(etrade_positions, 'Complete', 'dividend')
+        div_yield = _numeric_column(etrade_positions, 'Complete', 'divYield')
+    except (ValueError, TypeError, AttributeError):
+        # Fall back to per-position handling so one malformed position doesn't drop the rest
+        return list(map(transform_etrade_position, etrade_positions))
+    
+    # If no current price in Quick, calculate from market value and quantity
+    has_quantity = quantity > 0
+    implied_price = market_value / np.where(has_quantity, quantity, 1.0)
+    current_price = np.where((last_trade == 0) & has_quantity, implied_price, last_trade)
+    
+    # Calculate annual dividend income from each position
+    annual_dividend_income = np.where(annual_dividend > 0, annual_dividend * quantity, 0.0)
+    
+    # Convert each column to Python floats in one call rather than per element
+    rows = zip(etrade_positions, quantity.tolist(), current_price.tolist(), market_value.tolist(),
+               total_gain.tolist(), total_gain_pct.tolist(), annual_dividend.tolist(), dividend.tolist(),
+               div_yield.tolist(), annual_dividend_income.tolist())
+    
+    transformed = []
+    for pos, qty, price, value, gain, gain_pct, annual_div, div, dyield, div_income in rows:
+        symbol = pos.get('symbolDescription', '')
+        complete_data = pos.get('Complete', {})
+        transformed.append({
+            'symbol': symbol,
+            'description': symbol,  # Keep using symbol as description
+            'quantity': qty,
+            'current_price': price,
+            'market_value': value,
+            'gain_loss': gain,
+            'gain_loss_pct': gain_pct,
+            'annual_dividend': annual_div,
+            'dividend': div,
+            'div_yield': dyield,
+            'div_pay_date': complete_data.get('divPayDate', ''),
+            'ex_dividend_date': complete_data.get('exDividendDate', ''),
+            'annual_dividend_income': div_income
+        })
+    
+    return transformed
@@ -1,12 +1,29 @@
+import fnmatch
+import functools
+import re
+import sys
 import yaml
-import pandas as pd
-from typing import Dict, List, Tuple
+import numpy as np
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
+from operator import itemgetter
 import os
 
+# Use the LibYAML-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
-@dataclass
+if TYPE_CHECKING:
+    import pandas as pd  # Only the DataFrame helpers need pandas; imported on first use
+
+# Slotted dataclasses (no per-instance __dict__) need Python 3.10+
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class PortfolioPosition:
     """Represents a single portfolio position."""
     symbol: str
@@ -19,7 +36,7 @@ class PortfolioPosition:
     bucket: str = "Unassigned"
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class AccountInfo:
     """Represents account balance and margin information."""
     total_account_value: float
@@ -29,27 +46,58 @@ class AccountInfo:
     net_account_value: float
 
 
+# Transformed-position fields in PortfolioPosition constructor order
+_POSITION_FIELDS = itemgetter('symbol', 'description', 'quantity', 'current_price',
+                              'market_value', 'gain_loss', 'gain_loss_pct')
+
+# Type of one fallback matcher: (pattern, compiled wildcard regex or None for substring matching, bucket)
+PatternMatcher = Tuple[str, Optional[re.Pattern], str]
+
+
+@functools.lru_cache(maxsize=8)
+def _load_config_cached(config_path: str, mtime: float) -> Dict:
+    """Parse a YAML config once per (path, modification time)."""
+    with open(config_path, 'r') as file:
+        return yaml.load(file, Loader=_YamlLoader)
+
+
+@functools.lru_cache(maxsize=8)
+def _bucket_matchers_cached(config_path: str, mtime: float) -> Tuple[Dict[str, str], List[PatternMatcher]]:
+    """Build the exact-symbol map and pattern matchers for a config once per (path, modification time)."""
+    buckets = _load_config_cached(config_path, mtime).get('buckets', {})
+    
+    # Upper-case each entry once and use it for both the reverse mapping (quick
+    # exact lookup) and the fallback matchers, kept in config order (first match wins)
+    symbol_to_bucket = {}
+    pattern_matchers = []
+    for bucket_name, patterns in buckets.items():
+        for pattern in patterns:
+            pattern_upper = pattern.upper()
+            symbol_to_bucket[pattern_upper] = bucket_name
+            wildcard = re.compile(fnmatch.translate(pattern_upper)) if '*' in pattern_upper else None
+            pattern_matchers.append((pattern_upper, wildcard, bucket_name))
+    
+    return symbol_to_bucket, pattern_matchers
+
+
 class PortfolioAnalyzer:
     """Analyzes portfolio positions and generates bucket reports."""
     
     def __init__(self, config_path: str = "config.yml"):
-        self.config = self._load_config(config_path)
+        # Parsed config and derived lookups are shared by every analyzer built from
+        # the same, unchanged file (treat them as read-only)
+        mtime = self._config_mtime(config_path)
+        self.config = _load_config_cached(config_path, mtime)
         self.buckets = self.config.get('buckets', {})
         self.settings = self.config.get('settings', {})
-        
-        # Create reverse mapping for quick bucket lookup
-        self.symbol_to_bucket = {}
-        for bucket_name, symbols in self.buckets.items():
-            for symbol in symbols:
-                self.symbol_to_bucket[symbol.upper()] = bucket_name
+        self.symbol_to_bucket, self._pattern_matchers = _bucket_matchers_cached(config_path, mtime)
     
-    def _load_config(self, config_path: str) -> Dict:
-        """Load configuration from YAML file."""
+    def _config_mtime(self, config_path: str) -> float:
+        """Return the config file's modification time, used as the cache key."""
         if not os.path.exists(config_path):
             raise FileNotFoundError(f"Configuration file not found: {config_path}")
         
-        with open(config_path, 'r') as file:
-            return yaml.safe_load(file)
+        return os.path.getmtime(config_path)
     
     def assign_buckets_to_positions(self, positions: List[Dict]) -> List[PortfolioPosition]:
         """Assign bucket categories to positions."""
@@ -57,105 +105,159 @@ class PortfolioAnalyzer:
         min_value = self.settings.get('min_position_value', 100)
         
         for pos in positions:
-            if pos['market_value'] < min_value:
+            # Pull every field in one C-level call instead of a lookup per field
+            fields = _POSITION_FIELDS(pos)
+            if fields[4] < min_value:  # market_value
                 continue
-                
-            symbol = pos['symbol'].upper()
-            description = pos.get('description', pos['symbol']).upper()
             
             # Try multiple matching strategies
-            bucket = self._find_bucket_for_symbol(symbol, description)
+            bucket = self._find_bucket_for_symbol(fields[0].upper(), fields[1].upper())
             
-            portfolio_position = PortfolioPosition(
-                symbol=pos['symbol'],
-                description=pos['description'],
-                quantity=pos['quantity'],
-                current_price=pos['current_price'],
-                market_value=pos['market_value'],
-                gain_loss=pos['gain_loss'],
-                gain_loss_pct=pos['gain_loss_pct'],
-                bucket=bucket
-            )
-            portfolio_positions.append(portfolio_position)
+            portfolio_positions.append(PortfolioPosition(*fields, bucket=bucket))
         
         return portfolio_positions
     
+    def assign_buckets_df(self, df: 'pd.DataFrame') -> 'pd.DataFrame':
+        """Add a 'bucket' column to a DataFrame of transformed positions.
+        
+        Exact symbol matches are resolved with one vectorized lookup; only the
+        remaining rows go through the pattern-matching fallback.
+        """
+        if df.empty:
+            import pandas as pd
+            df['bucket'] = pd.Series(dtype=object)
+            return df
+        
+        symbols = df['symbol'].str.upper()
+        # Object dtype up front: with no exact matches map() yields an all-NaN float
+        # Series, which newer pandas refuses to fill with bucket names
+        buckets = symbols.map(self.symbol_to_bucket).astype(object)
+        
+        unmatched = buckets.isna()
+        if unmatched.any():
+            descriptions = df.loc[unmatched, 'description'].fillna(df['symbol']).str.upper()
+            buckets.loc[unmatched] = [self._find_bucket_for_symbol(symbol, description)
+                                  for symbol, description in zip(symbols[unmatched], descriptions)]
+        
+        df['bucket'] = buckets
+        return df
+    
     def _find_bucket_for_symbol(self, symbol: str, description: str) -> str:
-        """Find bucket for symbol using multiple matching strategies."""
+        """Find bucket for symbol using multiple matching strategies.
+        
+        Expects symbol and description already upper-cased (config patterns are).
+        """
         # Strategy 1: Exact match (current behavior)
-        if symbol in self.symbol_to_bucket:
-            return self.symbol_to_bucket[symbol]
+        bucket = self.symbol_to_bucket.get(symbol)
+        if bucket is not None:
+            return bucket
         
         # Strategy 2: Pattern matching for each bucket
-        for bucket_name, patterns in self.buckets.items():
-            for pattern in patterns:
-                pattern_upper = pattern.upper()
-                
-                # Wildcard matching
-                if '*' in pattern_upper:
-                    if self._matches_wildcard_pattern(symbol, description, pattern_upper):
-                        return bucket_name
-                
-                # Substring matching (contains)
-                elif pattern_upper in symbol or pattern_upper in description:
+        for pattern_upper, wildcard, bucket_name in self._pattern_matchers:
+            # Wildcard matching against symbol or description
+            if wildcard is not None:
+                if wildcard.match(symbol) or wildcard.match(description):
                     return bucket_name
+            
+            # Substring matching (contains)
+            elif pattern_upper in symbol or pattern_upper in description:
+                return bucket_name
         
         return "Unassigned"
     
-    def _matches_wildcard_pattern(self, symbol: str, description: str, pattern: str) -> bool:
-        """Check if symbol or description matches a wildcard pattern."""
-        import fnmatch
-        
-        # Try matching against both symbol and description
-        return (fnmatch.fnmatch(symbol, pattern) or 
-                fnmatch.fnmatch(description, pattern))
-    
     def calculate_bucket_allocations(self, positions: List[PortfolioPosition]) -> Dict[str, Dict]:
         """Calculate allocation percentages for each bucket."""
-        total_value = sum(pos.market_value for pos in positions)
+        return self._aggregate(positions)[0]
+    
+    def _aggregate(self, positions: List[PortfolioPosition]) -> Tuple[Dict[str, Dict], float, float, float, List[PortfolioPosition]]:
+        """Aggregate positions, returning (bucket allocations, total value, total gain/loss, cost basis, unassigned positions).
+        
+        Positions are grouped by bucket in one pass; the numeric totals are then
+        computed column-wise with NumPy. Only buckets that hold positions are returned.
+        """
+        # Configured bucket order, then Unassigned, then any other bucket in order of appearance
+        bucket_names = list(self.buckets.keys())
+        if 'Unassigned' not in self.buckets:
+            bucket_names.append('Unassigned')
+        bucket_index = {name: i for i, name in enumerate(bucket_names)}
+        bucket_positions: List[List[PortfolioPosition]] = [[] for _ in bucket_names]
+        
+        bucket_ids = np.empty(len(positions), dtype=np.int32)
+        find_index = bucket_index.get
+        for i, pos in enumerate(positions):
+            b = find_index(pos.bucket)
+            if b is None:
+                b = bucket_index[pos.bucket] = len(bucket_names)
+                bucket_names.append(pos.bucket)
+                bucket_positions.append([])
+            bucket_ids[i] = b
+            bucket_positions[b].append(pos)
+        
+        market_value = np.fromiter((pos.market_value for pos in positions), dtype=np.float64, count=len(positions))
+        gain_loss = np.fromiter((pos.gain_loss for pos in positions), dtype=np.float64, count=len(positions))
+        
+        total_value = float(market_value.sum())
+        total_gain_loss = float(gain_loss.sum())
+        total_cost_basis = float((market_value - gain_loss).sum())
+        unassigned_positions = list(bucket_positions[bucket_index['Unassigned']])
         
         if total_value == 0:
-            return {}
+            return {}, total_value, total_gain_loss, total_cost_basis, unassigned_positions
         
-        bucket_data = {}
+        # Per-bucket totals in one shot
+        bucket_totals = np.bincount(bucket_ids, weights=market_value, minlength=len(bucket_names))
+        percentages = bucket_totals * (100.0 / total_value)
         
-        # Initialize all configured buckets
-        for bucket_name in self.buckets.keys():
+        bucket_data = {}
+        for bucket_name, total, percentage, entries in zip(bucket_names, bucket_totals.tolist(),
+                                                           percentages.tolist(), bucket_positions):
+            if not entries:
+                continue
             bucket_data[bucket_name] = {
-                'total_value': 0.0,
-                'percentage': 0.0,
-                'positions': [],
-                'position_count': 0
+                'total_value': total,
+                'percentage': percentage,
+                'positions': entries,
+                'position_count': len(entries)
             }
         
-        # Add Unassigned bucket
-        bucket_data['Unassigned'] = {
-            'total_value': 0.0,
-            'percentage': 0.0,
-            'positions': [],
-            'position_count': 0
-        }
+        return bucket_data, total_value, total_gain_loss, total_cost_basis, unassigned_positions
+    
+    def calculate_bucket_allocations_df(self, df: 'pd.DataFrame') -> Dict[str, Dict]:
+        """Calculate allocation totals for each bucket from a DataFrame with a 'bucket' column.
         
-        # Calculate bucket totals
-        for pos in positions:
-            bucket = pos.bucket
-            if bucket not in bucket_data:
-                bucket_data[bucket] = {
-                    'total_value': 0.0,
-                    'percentage': 0.0,
-                    'positions': [],
-                    'position_count': 0
-                }
-            
-            bucket_data[bucket]['total_value'] += pos.market_value
-            bucket_data[bucket]['positions'].append(pos)
-            bucket_data[bucket]['position_count'] += 1
+        Same buckets and ordering as calculate_bucket_allocations (non-empty buckets
+        only), without the per-bucket position lists.
+        """
+        total_value = df['market_value'].sum() if not df.empty else 0.0
+        
+        if total_value == 0:
+            return {}
+        
+        grouped = df.groupby('bucket', sort=False).agg(
+            total_value=('market_value', 'sum'),
+            position_count=('market_value', 'size')
+        )
         
-        # Calculate percentages
-        for bucket in bucket_data:
-            bucket_data[bucket]['percentage'] = (bucket_data[bucket]['total_value'] / total_value) * 100
+        # Configured buckets first, then Unassigned, then anything else
+        order = list(self.buckets.keys())
+        if 'Unassigned' not in self.buckets:
+            order.append('Unassigned')
+        order += [bucket for bucket in grouped.index if bucket not in order]
+        order = [bucket for bucket in order if bucket in grouped.index]
+        grouped = grouped.reindex(order)
         
-        return bucket_data
+        totals = grouped['total_value'].tolist()
+        percentages = (grouped['total_value'] * (100.0 / total_value)).tolist()
+        counts = grouped['position_count'].tolist()
+        
+        return {
+            bucket: {
+                'total_value': total,
+                'percentage': percentage,
+                'position_count': count
+            }
+            for bucket, total, percentage, count in zip(order, totals, percentages, counts)
+        }
     
     def calculate_margin_utilization(self, account_info: AccountInfo) -> Dict[str, float]:
         """Calculate margin utilization metrics."""
@@ -184,14 +286,12 @@ class PortfolioAnalyzer:
     def generate_summary_report(self, positions: List[PortfolioPosition], 
                               account_info: AccountInfo) -> Dict:
         """Generate comprehensive portfolio summary report."""
-        bucket_allocations = self.calculate_bucket_allocations(positions)
+        (bucket_allocations, total_portfolio_value, total_gain_loss,
+         total_cost_basis, unassigned_positions) = self._aggregate(positions)
         margin_metrics = self.calculate_margin_utilization(account_info)
         
-        total_portfolio_value = sum(pos.market_value for pos in positions)
-        total_gain_loss = sum(pos.gain_loss for pos in positions)
-        total_gain_loss_pct = (total_gain_loss / (total_portfolio_value - total_gain_loss)) * 100 if total_portfolio_value > 0 else 0
-        
-        unassigned_positions = [pos for pos in positions if pos.bucket == "Unassigned"]
+        # Gain/loss relative to what was paid (cost basis = market value - gain/loss)
+        total_gain_loss_pct = (total_gain_loss / total_cost_basis) * 100 if total_cost_basis > 0 else 0.0
         
         return {
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
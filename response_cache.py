@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+E*TRADE Response Cache
+
+This module keeps short-lived on-disk copies of account API responses
+(balance, positions) so repeated runs within a few minutes reuse them
+instead of paying the network round-trips again.
+"""
+
+import hashlib
+import os
+import time
+from typing import Any, Callable, Dict
+
+import orjson
+
+
+class ResponseCache:
+    def __init__(self, cache_dir: str = ".cache", ttl_seconds: float = 300):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _get_cache_file(self, name: str, account_id_key: str) -> str:
+        """Generate cache filename for a response type and account."""
+        # Hash the account key for privacy
+        key = hashlib.blake2b(f"{name}:{account_id_key}".encode(), digest_size=8).hexdigest()
+        return os.path.join(self.cache_dir, f"response_{key}.json")
+
+    def get(self, name: str, account_id_key: str,
+            fetch: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return a cached response younger than the TTL, otherwise fetch and cache it."""
+        cache_file = self._get_cache_file(name, account_id_key)
+        try:
+            if time.time() - os.stat(cache_file).st_mtime < self.ttl_seconds:
+                with open(cache_file, 'rb') as f:
+                    return orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            pass  # Missing, unreadable or corrupted - fetch fresh
+
+        result = fetch(account_id_key)
+
+        # Don't keep errors (ours or E*TRADE's) or unparsed bodies around
+        if result and not any(key in result for key in ('error', 'code', 'raw_text')):
+            try:
+                tmp_file = cache_file + '.tmp'
+                with open(tmp_file, 'wb') as f:
+                    f.write(orjson.dumps(result))
+                os.replace(tmp_file, cache_file)
+            except Exception as e:
+                print(f"⚠️  Failed to save response cache: {e}")
+
+        return result
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        for filename in os.listdir(self.cache_dir):
+            if filename.startswith('response_') and filename.endswith('.json'):
+                os.remove(os.path.join(self.cache_dir, filename))
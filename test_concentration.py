@@ -14,10 +14,18 @@ The output will show:
 - Whether your configuration is working correctly
 """
 
+import functools
+import itertools
+
 import yaml
 from concentration_analyzer import ConcentrationAnalyzer
 
 
+def _format_link(link):
+    """Format one (symbol, multiplier) link of an exposure chain."""
+    return link[0] if link[1] == 1.0 else f"{link[0]} ({link[1]:.2f}x)"
+
+
 def test_concentration_analyzer():
     """Test the concentration analyzer with sample positions."""
     
@@ -84,11 +92,11 @@ def test_concentration_analyzer():
     print("-" * 80)
     
     for i, item in enumerate(concentrations, 1):
-        symbols = sorted(
-            set(pos['symbol'] for pos in item.contributing_positions),
-            key=lambda s: sum(p['exposure_value'] for p in item.contributing_positions if p['symbol'] == s),
-            reverse=True
-        )
+        # Total exposure per contributing symbol, largest first
+        totals = {}
+        for p in item.contributing_positions:
+            totals[p['symbol']] = totals.get(p['symbol'], 0) + p['exposure_value']
+        symbols = sorted(totals, key=totals.__getitem__, reverse=True)
         
         symbol_str = ', '.join(symbols)
         
@@ -100,30 +108,24 @@ def test_concentration_analyzer():
     print("=" * 80)
     print()
     
-    # Show exposure chains
+    # Show exposure chains (a symbol held in several lots is only resolved once)
+    get_chain = functools.lru_cache(maxsize=None)(analyzer.get_exposure_chain)
     for pos in sample_positions:
         symbol = pos['symbol']
-        chains = analyzer.get_exposure_chain(symbol)
+        chains = get_chain(symbol)
         
         if len(chains) == 1 and len(chains[0]) == 1:
             # No mapping
             print(f"{symbol}: {symbol} (no mapping)")
         elif len(chains) == 1:
             # Single chain
-            chain = chains[0]
-            chain_str = ' → '.join(
-                f"{c[0]} ({c[1]:.2f}x)" if c[1] != 1.0 else c[0] 
-                for c in chain
-            )
+            chain_str = ' → '.join(map(_format_link, chains[0]))
             print(f"{symbol}: {chain_str}")
         else:
             # Multiple chains
             print(f"{symbol}:")
             for i, chain in enumerate(chains, 1):
-                chain_str = ' → '.join(
-                    f"{c[0]} ({c[1]:.2f}x)" if c[1] != 1.0 else c[0] 
-                    for c in chain
-                )
+                chain_str = ' → '.join(map(_format_link, chain))
                 print(f"  [{i}] {chain_str}")
     
     print()
@@ -132,23 +134,25 @@ def test_concentration_analyzer():
     print("=" * 80)
     print()
     
-    # Calculate insights
-    if len(concentrations) >= 3:
-        top_3_pct = sum(item.percentage for item in concentrations[:3])
-        print(f"• Top 3 concentrations: {top_3_pct:.1f}% of portfolio")
+    # Calculate insights (cumulative[n - 1] is the share of the top n)
+    cumulative = list(itertools.accumulate(item.percentage for item in concentrations))
+    for n in (3, 5):
+        if len(cumulative) >= n:
+            print(f"• Top {n} concentrations: {cumulative[n - 1]:.1f}% of portfolio")
     
-    if len(concentrations) >= 5:
-        top_5_pct = sum(item.percentage for item in concentrations[:5])
-        print(f"• Top 5 concentrations: {top_5_pct:.1f}% of portfolio")
+    # Split into high (>= 15%) and moderate (10-15%) concentration risk in one pass
+    high_risk, moderate_risk = [], []
+    for c in concentrations:
+        if c.percentage >= 15:
+            high_risk.append(c)
+        elif c.percentage >= 10:
+            moderate_risk.append(c)
     
-    # Check for high concentration risk
-    high_risk = [c for c in concentrations if c.percentage >= 15]
     if high_risk:
         print(f"\n⚠️  High concentration risk detected:")
         for item in high_risk:
             print(f"   - {item.underlying}: {item.percentage:.1f}%")
     
-    moderate_risk = [c for c in concentrations if 10 <= c.percentage < 15]
     if moderate_risk:
         print(f"\n⚡ Moderate concentration:")
         for item in moderate_risk:
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tests for ETradeSimpleAPI response parsing
+
+Pins the shapes that JSON and XML responses are parsed into, for one and for
+several positions or transactions and for error bodies, as seen through
+extract_positions and TransactionCache._fetch_recent_transactions.
+
+Usage:
+    python test_etrade_simple_api.py
+"""
+
+import io
+import tempfile
+from typing import Any, Dict, Optional
+
+import orjson
+import requests
+from urllib3.response import HTTPResponse
+
+from etrade_simple_api import ETradeSimpleAPI
+from transaction_cache import TransactionCache
+
+
+def _make_api() -> ETradeSimpleAPI:
+    """Build an API client that is never authenticated and never hits the network."""
+    return ETradeSimpleAPI('test-key', 'test-secret', use_sandbox=True)
+
+
+def _response(body: bytes, content_type: str, streamed: bool = False) -> requests.Response:
+    """Build a 200 response with the given body, buffered or left on the raw stream."""
+    response = requests.Response()
+    response.status_code = 200
+    response.headers['content-type'] = content_type
+    if streamed:
+        response.raw = HTTPResponse(body=io.BytesIO(body), preload_content=False)
+    else:
+        response._content = body
+    return response
+
+
+def _json(data: Dict[str, Any]) -> requests.Response:
+    return _response(orjson.dumps(data), 'application/json')
+
+
+def _xml(body: str, streamed: bool = False) -> requests.Response:
+    return _response(body.encode('utf-8'), 'application/xml', streamed)
+
+
+class FakeAPI:
+    """Answers get_account_transactions with a canned response run through the real parser."""
+
+    def __init__(self, response: requests.Response):
+        self.response = response
+
+    def get_account_transactions(self, account_id_key: str, count: int = 50,
+                                 marker: Optional[str] = None, etag: Optional[str] = None) -> Dict[str, Any]:
+        return _make_api()._parse_response(self.response)
+
+
+def _fetch_recent(response: requests.Response):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        return TransactionCache(FakeAPI(response), cache_dir)._fetch_recent_transactions('acct')
+
+
+def test_positions_json_single():
+    """A JSON portfolio with one position: root and one-element AccountPortfolio list unwrapped."""
+    parsed = _make_api()._parse_response(_json({'PortfolioResponse': {'AccountPortfolio': [
+        {'accountId': '1', 'Position': [{'symbolDescription': 'AAPL', 'quantity': 10}]}]}}))
+    assert parsed['AccountPortfolio']['accountId'] == '1'
+    assert ETradeSimpleAPI.extract_positions(parsed) == [{'symbolDescription': 'AAPL', 'quantity': 10}]
+
+
+def test_positions_json_multiple():
+    parsed = _make_api()._parse_response(_json({'PortfolioResponse': {'AccountPortfolio': [
+        {'accountId': '1', 'Position': [{'symbolDescription': 'AAPL', 'quantity': 10},
+                                        {'symbolDescription': 'MSFT', 'quantity': 5}]}]}}))
+    positions = ETradeSimpleAPI.extract_positions(parsed)
+    assert [p['symbolDescription'] for p in positions] == ['AAPL', 'MSFT']
+    assert positions[0]['quantity'] == 10
+
+
+def test_positions_xml_single():
+    """One XML <Position> parses to a bare dict, which extract_positions wraps in a list."""
+    body = ('<PortfolioResponse><AccountPortfolio><accountId>1</accountId>'
+            '<Position><symbolDescription>AAPL</symbolDescription><quantity>10</quantity></Position>'
+            '</AccountPortfolio></PortfolioResponse>')
+    for streamed in (False, True):
+        parsed = _make_api()._parse_response(_xml(body, streamed), streamed=streamed)
+        assert parsed['AccountPortfolio']['accountId'] == '1'
+        assert ETradeSimpleAPI.extract_positions(parsed) == [{'symbolDescription': 'AAPL', 'quantity': '10'}]
+
+
+def test_positions_xml_multiple():
+    body = ('<PortfolioResponse><AccountPortfolio><accountId>1</accountId>'
+            '<Position><symbolDescription>AAPL</symbolDescription><quantity>10</quantity></Position>'
+            '<Position><symbolDescription>MSFT</symbolDescription><quantity>5</quantity></Position>'
+            '</AccountPortfolio></PortfolioResponse>')
+    for streamed in (False, True):
+        parsed = _make_api()._parse_response(_xml(body, streamed), streamed=streamed)
+        assert ETradeSimpleAPI.extract_positions(parsed) == [
+            {'symbolDescription': 'AAPL', 'quantity': '10'},
+            {'symbolDescription': 'MSFT', 'quantity': '5'},
+        ]
+
+
+def test_transactions_json():
+    one = {'transactionId': 1, 'transactionDate': 1700000000000, 'transactionType': 'Dividend'}
+    two = {'transactionId': 2, 'transactionDate': 1690000000000, 'transactionType': 'Bought'}
+    for rows in ([one], [one, two]):
+        transactions, etag = _fetch_recent(_json({'TransactionListResponse': {
+            'Transaction': rows, 'transactionCount': len(rows)}}))
+        assert transactions == rows
+        assert etag is None
+
+
+def test_transactions_xml():
+    """A single XML <Transaction> comes back as a one-element list, like JSON."""
+    row = '<Transaction><transactionId>{0}</transactionId><transactionType>Dividend</transactionType></Transaction>'
+    transactions, _ = _fetch_recent(_xml(f'<TransactionListResponse>{row.format(1)}</TransactionListResponse>'))
+    assert transactions == [{'transactionId': '1', 'transactionType': 'Dividend'}]
+
+    transactions, _ = _fetch_recent(_xml(
+        f'<TransactionListResponse>{row.format(1)}{row.format(2)}</TransactionListResponse>'))
+    assert [t['transactionId'] for t in transactions] == ['1', '2']
+
+
+def test_error_body():
+    """JSON and XML error bodies both parse to a top-level code/message and yield no transactions."""
+    json_error = _make_api()._parse_response(_json({'Error': {'code': 10033, 'message': 'Invalid account key'}}))
+    assert json_error == {'code': 10033, 'message': 'Invalid account key'}
+    xml_error = _make_api()._parse_response(_xml('<Error><code>10033</code><message>Invalid account key</message></Error>'))
+    assert xml_error == {'code': '10033', 'message': 'Invalid account key'}
+
+    assert ETradeSimpleAPI.extract_positions(json_error) == []
+    for response in (_json({'Error': {'code': 10033, 'message': 'Invalid account key'}}),
+                     _xml('<Error><code>10033</code><message>Invalid account key</message></Error>')):
+        assert _fetch_recent(response) == ([], None)
+
+
+if __name__ == "__main__":
+    test_positions_json_single()
+    test_positions_json_multiple()
+    test_positions_xml_single()
+    test_positions_xml_multiple()
+    test_transactions_json()
+    test_transactions_xml()
+    test_error_body()
+    print("✅ All response parsing tests passed")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for PortfolioAnalyzer bucket assignment
+
+Checks that DataFrame bucket assignment works whether positions match a
+bucket symbol exactly, only through patterns, or not at all.
+
+Usage:
+    python test_portfolio_analyzer.py
+"""
+
+import os
+import tempfile
+
+import pandas as pd
+
+from portfolio_analyzer import PortfolioAnalyzer
+
+
+SAMPLE_CONFIG = """
+buckets:
+  Tech:
+    - AAPL
+    - MSFT
+  Bitcoin:
+    - "*BTC*"
+    - MSTR
+settings:
+  min_position_value: 100
+"""
+
+
+def _make_analyzer() -> PortfolioAnalyzer:
+    """Build an analyzer from a throwaway config file."""
+    fd, path = tempfile.mkstemp(suffix='.yml')
+    with os.fdopen(fd, 'w') as f:
+        f.write(SAMPLE_CONFIG)
+    try:
+        return PortfolioAnalyzer(path)
+    finally:
+        os.remove(path)
+
+
+def test_assign_buckets_df_all_unmatched():
+    """No exact symbol matches: every row goes through the pattern fallback."""
+    df = pd.DataFrame({
+        'symbol': ['IBTC', 'XYZ'],
+        'description': ['ISHARES BTC TRUST', None],
+    })
+    result = _make_analyzer().assign_buckets_df(df)
+    assert result['bucket'].tolist() == ['Bitcoin', 'Unassigned']
+
+
+def test_assign_buckets_df_mixed():
+    """Exact matches and pattern/unassigned rows in the same frame."""
+    df = pd.DataFrame({
+        'symbol': ['aapl', 'GBTC', 'MSTR', 'ZZZ'],
+        'description': ['APPLE INC', 'GRAYSCALE BTC', 'MICROSTRATEGY', 'UNKNOWN'],
+    })
+    result = _make_analyzer().assign_buckets_df(df)
+    assert result['bucket'].tolist() == ['Tech', 'Bitcoin', 'Bitcoin', 'Unassigned']
+
+
+if __name__ == "__main__":
+    test_assign_buckets_df_all_unmatched()
+    test_assign_buckets_df_mixed()
+    print("✅ All bucket assignment tests passed")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Tests for TransactionCache
+
+Runs the cache against a fake API in a temporary directory, so no E*TRADE
+credentials or network access are needed.
+
+Usage:
+    python test_transaction_cache.py
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+import transaction_cache
+from transaction_cache import TransactionCache
+
+
+class FakeAPI:
+    """Serves a fixed, newest-first transaction list like get_account_transactions."""
+
+    def __init__(self, transactions: List[Dict[str, Any]]):
+        self.transactions = transactions
+
+    def get_account_transactions(self, account_id_key: str, count: int = 50,
+                                 marker: Optional[str] = None, etag: Optional[str] = None) -> Dict[str, Any]:
+        if marker:
+            return {}
+        return {'Transaction': self.transactions[:count], 'totalCount': len(self.transactions)}
+
+
+def _transaction(trans_id: int, days_ago: float) -> Dict[str, Any]:
+    date = datetime.now() - timedelta(days=days_ago)
+    return {'transactionId': trans_id, 'transactionDate': int(date.timestamp() * 1000),
+            'transactionType': 'Dividend'}
+
+
+@contextmanager
+def _temp_cache(api: FakeAPI, ttl_seconds: float) -> Iterator[TransactionCache]:
+    """A cache in a temporary directory that is removed once queued writes have finished."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        try:
+            yield TransactionCache(api, cache_dir, ttl_seconds=ttl_seconds)
+        finally:
+            # The background writer may still be saving into the directory
+            transaction_cache._writer.flush()
+
+
+def _shard_months(cache: TransactionCache, account_id_key: str) -> set:
+    """Months that have a shard file on disk for the account."""
+    transaction_cache._writer.flush()
+    manifest = os.path.basename(cache._get_cache_file(account_id_key))
+    prefix = manifest[:-len('manifest.json')]
+    return {name[len(prefix):-len('.json')] for name in os.listdir(cache.cache_dir)
+            if name.startswith(prefix) and name != manifest}
+
+
+def test_full_refresh_removes_old_shards():
+    """A force refresh over a shorter range deletes shards for months it no longer covers."""
+    api = FakeAPI([_transaction(i, i * 10) for i in range(1, 40)])
+    with _temp_cache(api, ttl_seconds=0) as cache:
+        cache.get_transactions('acct', days_back=400, force_refresh=True)
+        assert len(_shard_months(cache, 'acct')) > 3
+
+        cache.get_transactions('acct', days_back=15, force_refresh=True)
+        cache_data = cache._load_cache('acct')
+        assert _shard_months(cache, 'acct') == set(cache_data['shards'])
+        assert len(cache_data['transactions']) == 1  # Only transaction 1 is within 15 days
+
+
+def test_undated_transaction_is_persisted():
+    """A new transaction without a date is saved once, not reported as new on every check."""
+    transactions = [_transaction(i, i) for i in range(1, 20)]
+    api = FakeAPI(transactions)
+    with _temp_cache(api, ttl_seconds=0) as cache:
+        cache.get_transactions('acct', days_back=10)
+
+        api.transactions = [{'transactionId': 100, 'transactionType': 'Adjustment'}] + transactions
+        cache.get_transactions('acct', days_back=5)
+        cache_data = cache._load_cache('acct')
+        assert transaction_cache.UNDATED_SHARD in cache_data['shards']
+        assert 100 in {t['transactionId'] for t in cache_data['transactions']}
+
+        # The next check finds nothing new, so it only marks the cache as synced
+        before = os.path.getmtime(cache._get_cache_file('acct', transaction_cache.UNDATED_SHARD))
+        cache.get_transactions('acct', days_back=5)
+        transaction_cache._writer.flush()
+        assert os.path.getmtime(cache._get_cache_file('acct', transaction_cache.UNDATED_SHARD)) == before
+
+
+def test_returned_transactions_do_not_alias_cache():
+    """Changing a returned transaction must not change what later calls see."""
+    api = FakeAPI([_transaction(i, i) for i in range(1, 20)])
+    with _temp_cache(api, ttl_seconds=60) as cache:
+        cache.get_transactions('acct', days_back=10)
+
+        first = cache.get_transactions('acct', days_back=5)
+        first[0]['transactionType'] = 'Changed'
+        second = cache.get_transactions('acct', days_back=5)
+        assert second[0]['transactionType'] == 'Dividend'
+
+
+def test_returned_transactions_are_deep_copies():
+    """Changing a nested field of a returned transaction must not leak into later calls."""
+    transactions = [_transaction(i, i) for i in range(1, 20)]
+    for trans in transactions:
+        trans['brokerage'] = {'quantity': 1}
+    api = FakeAPI(transactions)
+    with _temp_cache(api, ttl_seconds=60) as cache:
+        cache.get_transactions('acct', days_back=10)
+
+        first = cache.get_transactions('acct', days_back=5)
+        first[0]['brokerage']['quantity'] = 999
+        second = cache.get_transactions('acct', days_back=5)
+        assert second[0]['brokerage']['quantity'] == 1
+
+
+def test_ts_key_is_not_persisted_or_returned():
+    """The private '_ts' sort key stays out of shard files and returned transactions."""
+    api = FakeAPI([_transaction(i, i) for i in range(1, 20)])
+    with _temp_cache(api, ttl_seconds=60) as cache:
+        returned = cache.get_transactions('acct', days_back=10)
+        returned += cache.get_transactions('acct', days_back=10)
+        assert returned and all('_ts' not in trans for trans in returned)
+
+        for month in _shard_months(cache, 'acct'):
+            shard = cache._read_json(cache._get_cache_file('acct', month))
+            assert all('_ts' not in trans for trans in shard['transactions'])
+
+
+if __name__ == "__main__":
+    test_full_refresh_removes_old_shards()
+    test_undated_transaction_is_persisted()
+    test_returned_transactions_do_not_alias_cache()
+    test_returned_transactions_are_deep_copies()
+    test_ts_key_is_not_persisted_or_returned()
+    print("✅ All transaction cache tests passed")
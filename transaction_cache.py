@@ -6,90 +6,470 @@ This module handles fetching and caching of E*TRADE transactions to avoid
 repeated API calls and provide efficient access to transaction history.
 """
 
-import json
+import atexit
+import functools
+import heapq
+import itertools
+import logging
+import mmap
 import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple
 import hashlib
+import numpy as np
+import orjson
 from etrade_simple_api import ETradeSimpleAPI
 
+logger = logging.getLogger(__name__)
+
+# Bump when the shape of cached transactions changes (2: JSON API responses with numeric IDs,
+# 3: one file per month plus a manifest)
+CACHE_VERSION = 3
+
+# Upper bound on threads used to read or remove cache files in parallel
+MAX_IO_WORKERS = 8
+
+# Shard for transactions whose date can't be parsed; sorts before every real month
+UNDATED_SHARD = '0000-00'
+
+
+@functools.lru_cache(maxsize=32)
+def _hash_account(account_id_key: str) -> str:
+    """Short, stable hash of an account key for use in cache filenames."""
+    return hashlib.blake2b(account_id_key.encode('utf-8'), digest_size=4).hexdigest()
+
+
+@functools.lru_cache(maxsize=256)
+def _cache_path(cache_dir: str, account_id_key: str, suffix: str) -> str:
+    """Path of one of an account's cache files (manifest or a month's shard)."""
+    # Hash the account key for privacy
+    return os.path.join(cache_dir, f"transactions_{_hash_account(account_id_key)}_{suffix}.json")
+
+
+def _read_json_file(path: str) -> Optional[Dict[str, Any]]:
+    """Parse a cache file; None if it's missing or corrupted."""
+    try:
+        # Parse straight from the mapped file instead of copying it into a bytes object first
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+    except (ValueError, FileNotFoundError):
+        # ValueError covers orjson.JSONDecodeError and empty files, which mmap refuses
+        return None
+
+
+@functools.lru_cache(maxsize=64)
+def _read_shard_cached(path: str, stamp: Tuple[int, int, int]) -> Optional[Dict[str, Any]]:
+    """Parsed shard for one version of the file (mtime, size, inode); rewrites change the stamp."""
+    return _read_json_file(path)
+
+
+def _ensure_ts(trans: Dict[str, Any]) -> Optional[int]:
+    """Return a transaction's date as epoch milliseconds, parsed once and kept under '_ts' in memory."""
+    ts = trans.get('_ts')
+    if ts is None:
+        try:
+            ts = trans['_ts'] = int(trans.get('transactionDate', 0))
+        except (ValueError, TypeError):
+            return None
+    return ts
+
+
+def _without_ts(trans: Dict[str, Any]) -> Dict[str, Any]:
+    """Shallow copy of a transaction without the in-memory '_ts' key, for writing or returning."""
+    return {key: value for key, value in trans.items() if key != '_ts'}
+
+
+def _to_ms(dt: datetime) -> int:
+    """Convert a local datetime to epoch milliseconds."""
+    return int(dt.timestamp() * 1000)
+
+
+def _newest_first_index(transactions: List[Dict[str, Any]], ts_ms: int) -> int:
+    """Binary search a newest-first list for the first transaction older than ts_ms."""
+    lo, hi = 0, len(transactions)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if (_ensure_ts(transactions[mid]) or 0) >= ts_ms:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _merge_newest_first(new_transactions: List[Dict[str, Any]],
+                        cached_transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge two newest-first lists in one pass, keeping the first row per transaction ID."""
+    seen_ids = set()
+    seen_ids_add = seen_ids.add
+    merged = []
+    # heapq.merge is stable, so on equal timestamps new transactions come first
+    for trans in heapq.merge(new_transactions, cached_transactions, key=lambda t: -(_ensure_ts(t) or 0)):
+        trans_id = trans.get('transactionId')
+        if trans_id and trans_id not in seen_ids:
+            seen_ids_add(trans_id)
+            merged.append(trans)
+    return merged
+
+
+def _month_of(ts: Optional[int]) -> str:
+    """Return the YYYY-MM shard a transaction timestamp belongs to."""
+    # A missing transactionDate parses to 0; like _split_by_month, treat it as undated
+    if ts is None or ts < 1:
+        return UNDATED_SHARD
+    return datetime.fromtimestamp(ts / 1000).strftime('%Y-%m')
+
+
+def _split_by_month(transactions: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group a newest-first list into monthly slices.
+    
+    Each month's boundary is found by binary search, so dates are only
+    converted once per month rather than once per transaction.
+    """
+    by_month: Dict[str, List[Dict[str, Any]]] = {}
+    # Undated transactions sort as 0, after every real date
+    end = _newest_first_index(transactions, 1)
+    start = 0
+    while start < end:
+        month_start = datetime.fromtimestamp(_ensure_ts(transactions[start]) / 1000).replace(
+            day=1, hour=0, minute=0, second=0, microsecond=0)
+        stop = _newest_first_index(transactions, _to_ms(month_start))
+        by_month[month_start.strftime('%Y-%m')] = transactions[start:stop]
+        start = stop
+    if end < len(transactions):
+        by_month[UNDATED_SHARD] = transactions[end:]
+    return by_month
+
+
+class _AsyncCacheWriter:
+    """Single background thread that performs cache writes off the caller's path.
+    
+    Jobs are queued per key and run in order. A full rewrite supersedes
+    anything still queued for the same key, so back-to-back full saves only
+    hit the disk once.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Any, List[Callable[[], None]]] = {}
+        self._busy = False
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, key: Any, job: Callable[[], None], replaces_pending: bool = False) -> None:
+        with self._cond:
+            if replaces_pending or key not in self._pending:
+                self._pending[key] = [job]
+            else:
+                self._pending[key].append(job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='transaction-cache-writer', daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self) -> None:
+        """Block until every queued write has finished."""
+        with self._cond:
+            while self._pending or self._busy:
+                self._cond.wait()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                jobs = self._pending.pop(next(iter(self._pending)))
+                self._busy = True
+            try:
+                for job in jobs:
+                    try:
+                        job()
+                    except Exception as e:
+                        # Keep the thread alive; a dead writer would hang flush()
+                        print(f"⚠️  Failed to save cache: {e}")
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+
+_writer = _AsyncCacheWriter()
+# The writer is a daemon thread; don't let the interpreter exit with saves still queued
+atexit.register(_writer.flush)
+
+
+@dataclass
+class _TxnTable:
+    """Transactions alongside their timestamps as a column, so sorting doesn't touch each dict."""
+    ts: List[int]
+    payloads: List[Dict[str, Any]]
+
+    @classmethod
+    def from_transactions(cls, transactions: List[Dict[str, Any]]) -> '_TxnTable':
+        return cls(
+            # Unparseable dates sort as 0, i.e. oldest
+            ts=[_ensure_ts(trans) or 0 for trans in transactions],
+            payloads=transactions
+        )
+
+    def take(self, idx) -> '_TxnTable':
+        """Return a new table with the rows at the given positions."""
+        ts, payloads = self.ts, self.payloads
+        return _TxnTable([ts[i] for i in idx], [payloads[i] for i in idx])
+
+    def newest_first(self) -> '_TxnTable':
+        # Stable sort on negated timestamps keeps ties in their original order
+        return self.take(np.argsort(-np.asarray(self.ts, dtype=np.int64), kind='stable').tolist())
+
 
 class TransactionCache:
-    def __init__(self, api: ETradeSimpleAPI, cache_dir: str = ".cache"):
+    def __init__(self, api: ETradeSimpleAPI, cache_dir: str = ".cache", ttl_seconds: float = 60):
         self.api = api
         self.cache_dir = cache_dir
+        # Within this many seconds of the last sync, serve the cache without asking the API
+        self.ttl_seconds = ttl_seconds
         os.makedirs(cache_dir, exist_ok=True)
+        self._prefetch()
     
-    def _get_cache_file(self, account_id_key: str) -> str:
-        """Generate cache filename for account."""
-        # Hash the account key for privacy
-        account_hash = hashlib.md5(account_id_key.encode()).hexdigest()[:8]
-        return os.path.join(self.cache_dir, f"transactions_{account_hash}.json")
+    def _prefetch(self) -> None:
+        """Ask the OS to start reading every cache file into the page cache."""
+        if not hasattr(os, 'posix_fadvise'):
+            return  # Not available on macOS/Windows; loads just read cold
+        for filename in os.listdir(self.cache_dir):
+            if filename.startswith('transactions_') and filename.endswith('.json'):
+                try:
+                    fd = os.open(os.path.join(self.cache_dir, filename), os.O_RDONLY)
+                    try:
+                        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                    finally:
+                        os.close(fd)
+                except OSError:
+                    pass  # Only a hint
     
-    def _load_cache(self, account_id_key: str) -> Dict[str, Any]:
-        """Load cached transactions for account."""
-        cache_file = self._get_cache_file(account_id_key)
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'r') as f:
-                    cache_data = json.load(f)
-                    # Convert date strings back to timestamps for consistency
-                    return cache_data
-            except (json.JSONDecodeError, FileNotFoundError):
-                print("⚠️  Cache file corrupted, will rebuild")
-                return {'transactions': [], 'last_updated': None}
-        return {'transactions': [], 'last_updated': None}
+    def _get_cache_file(self, account_id_key: str, month: Optional[str] = None) -> str:
+        """Generate cache filename for account: the manifest, or one month's shard."""
+        return _cache_path(self.cache_dir, account_id_key, month or 'manifest')
+    
+    def _read_json(self, path: str) -> Optional[Dict[str, Any]]:
+        """Read a cache file; None if it's missing or corrupted."""
+        return _read_json_file(path)
     
-    def _save_cache(self, account_id_key: str, transactions: List[Dict[str, Any]]) -> None:
-        """Save transactions to cache."""
-        cache_file = self._get_cache_file(account_id_key)
-        cache_data = {
+    def _read_shard(self, path: str) -> Optional[Dict[str, Any]]:
+        """Read a monthly shard, reusing the parsed copy while the file is unchanged.
+        
+        The result is shared between calls and must not be modified.
+        """
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return _read_shard_cached(path, (st.st_mtime_ns, st.st_size, st.st_ino))
+    
+    def _write_json(self, path: str, data: Dict[str, Any]) -> None:
+        """Write a cache file atomically."""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(data))
+        os.replace(tmp_path, path)
+    
+    def _load_cache(self, account_id_key: str, since_ms: Optional[int] = None) -> Dict[str, Any]:
+        """Load cached transactions for account, sorted newest first.
+        
+        Only monthly shards from the month of since_ms onwards, plus undated
+        transactions, are read; the manifest's 'shards' and 'oldest_ts' still
+        describe the whole cache.
+        """
+        # Read our own queued writes
+        _writer.flush()
+        
+        empty = {'transactions': [], 'last_updated': None, 'oldest_ts': None, 'shards': {}}
+        manifest_file = self._get_cache_file(account_id_key)
+        if not os.path.exists(manifest_file):
+            return empty
+        
+        manifest = self._read_json(manifest_file)
+        if manifest is None:
+            print("⚠️  Cache file corrupted, will rebuild")
+            return empty
+        if manifest.get('version') != CACHE_VERSION:
+            print("📁 Cache was written by an older version, will rebuild")
+            return empty
+        
+        start_month = _month_of(since_ms) if since_ms is not None else UNDATED_SHARD
+        # The undated shard has no month to range over, so it is always read (it sorts last)
+        months = [month for month in sorted(manifest.get('shards', {}), reverse=True)
+                  if month >= start_month or month == UNDATED_SHARD]
+        paths = [self._get_cache_file(account_id_key, month) for month in months]
+        
+        # Issue the shard reads together rather than one blocking read after another
+        if len(paths) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(paths), MAX_IO_WORKERS)) as executor:
+                shards = list(executor.map(self._read_shard, paths))
+        else:
+            shards = [self._read_shard(path) for path in paths]
+        
+        transactions = []
+        for shard in shards:
+            if shard is None:
+                print("⚠️  Cache file corrupted, will rebuild")
+                return empty
+            transactions.extend(shard.get('transactions', []))
+        
+        for trans in transactions:
+            _ensure_ts(trans)
+        
+        return {
             'transactions': transactions,
-            'last_updated': datetime.now().isoformat()
+            'last_updated': manifest.get('last_updated'),
+            'oldest_ts': manifest.get('oldest_ts'),
+            'shards': manifest.get('shards', {}),
+            'etag': manifest.get('etag')
         }
+    
+    def _save_cache(self, account_id_key: str, transactions: List[Dict[str, Any]],
+                    months: Optional[set] = None, etag: Optional[str] = None) -> None:
+        """Save transactions to cache, one file per month, on the background writer.
+        
+        With months=None the cache is replaced by `transactions`. Otherwise only
+        the listed months are rewritten, and `transactions` must hold every
+        cached transaction from those months. `etag` is the ETag of the recent
+        transactions response the cache now matches, if any.
+        """
+        _writer.submit((self.cache_dir, account_id_key),
+                       functools.partial(self._write_cache, account_id_key, transactions, months, etag),
+                       replaces_pending=months is None)
+    
+    def _write_cache(self, account_id_key: str, transactions: List[Dict[str, Any]],
+                     months: Optional[set] = None, etag: Optional[str] = None) -> None:
+        """Write the shards and manifest for _save_cache."""
+        now = datetime.now().isoformat()
+        # Shards are kept newest first so loads come back sorted
+        transactions = _TxnTable.from_transactions(transactions).newest_first().payloads
+        by_month = _split_by_month(transactions)
+        
+        manifest = self._read_json(self._get_cache_file(account_id_key)) if months is not None else None
+        if manifest is None or manifest.get('version') != CACHE_VERSION:
+            manifest = {'shards': {}, 'oldest_ts': None}
+            months = None
+        
         try:
-            with open(cache_file, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+            shards = manifest.get('shards', {})
+            if months is None:
+                # Full replace: drop every shard on disk that no longer has transactions.
+                # Scan the directory rather than trusting the old manifest, which may be
+                # missing, from an older version, or out of step with the files
+                prefix = f"transactions_{_hash_account(account_id_key)}_"
+                manifest_name = os.path.basename(self._get_cache_file(account_id_key))
+                with os.scandir(self.cache_dir) as entries:
+                    on_disk = {entry.name[len(prefix):-len('.json')] for entry in entries
+                               if entry.name.startswith(prefix) and entry.name.endswith('.json')
+                               and entry.name != manifest_name}
+                stale_months = on_disk - set(by_month)
+                months = set(by_month)
+                shards = {}
+                # Single-file cache from before monthly shards
+                legacy_file = os.path.join(self.cache_dir, f"transactions_{_hash_account(account_id_key)}.json")
+                if os.path.exists(legacy_file):
+                    os.remove(legacy_file)
+            else:
+                stale_months = {month for month in months if month not in by_month}
+            
+            for month in months:
+                if month in by_month:
+                    self._write_json(self._get_cache_file(account_id_key, month),
+                                     {'version': CACHE_VERSION,
+                                      'transactions': [_without_ts(trans) for trans in by_month[month]]})
+                    shards[month] = now
+            for month in stale_months:
+                shards.pop(month, None)
+                shard_file = self._get_cache_file(account_id_key, month)
+                if os.path.exists(shard_file):
+                    os.remove(shard_file)
+            
+            # Manifest goes last so it never lists a shard that wasn't written
+            # The oldest dated transaction is the last one before the undated tail
+            dated_end = _newest_first_index(transactions, 1)
+            timestamps = [_ensure_ts(transactions[dated_end - 1])] if dated_end else []
+            if manifest.get('oldest_ts') is not None:
+                timestamps.append(manifest['oldest_ts'])
+            self._write_json(self._get_cache_file(account_id_key), {
+                'version': CACHE_VERSION,
+                'shards': shards,
+                'oldest_ts': min(timestamps) if timestamps else None,
+                'last_updated': now,
+                'etag': etag
+            })
         except Exception as e:
             print(f"⚠️  Failed to save cache: {e}")
     
-    def _fetch_recent_transactions(self, account_id_key: str, count: int = 50) -> List[Dict[str, Any]]:
-        """Fetch recent transactions from API."""
+    def _mark_synced(self, account_id_key: str, etag: Optional[str] = None) -> None:
+        """Record that the cache was just checked against the API, without rewriting shards."""
+        _writer.submit((self.cache_dir, account_id_key),
+                       functools.partial(self._write_synced, account_id_key, etag))
+    
+    def _write_synced(self, account_id_key: str, etag: Optional[str] = None) -> None:
+        """Update the manifest's last_updated and ETag for _mark_synced."""
+        manifest_file = self._get_cache_file(account_id_key)
+        manifest = self._read_json(manifest_file)
+        if manifest is None:
+            return
+        manifest['last_updated'] = datetime.now().isoformat()
+        manifest['etag'] = etag
         try:
-            response = self.api.get_account_transactions(account_id_key, count=count)
+            self._write_json(manifest_file, manifest)
+        except Exception as e:
+            print(f"⚠️  Failed to save cache: {e}")
+    
+    def _fetch_recent_transactions(self, account_id_key: str, count: int = 50,
+                                   etag: Optional[str] = None) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+        """Fetch recent transactions from API.
+        
+        Returns the transactions and the response's ETag. With an ETag from a
+        previous check, the transactions are None if the list hasn't changed.
+        """
+        try:
+            response = self.api.get_account_transactions(account_id_key, count=count, etag=etag)
+            
+            if response.get('notModified'):
+                return None, etag
             
             if 'Transaction' not in response:
                 if isinstance(response, dict) and 'code' in response:
                     print(f"❌ API Error: {response.get('message', 'Unknown error')}")
-                return []
+                return [], None
             
             transactions = response['Transaction']
             if not isinstance(transactions, list):
                 transactions = [transactions]
             
-            return transactions
+            return transactions, response.get('etag')
         except Exception as e:
             print(f"❌ Error fetching transactions: {e}")
-            return []
+            return [], None
     
     def _fetch_paginated_transactions(self, account_id_key: str, days_back: int = 30) -> List[Dict[str, Any]]:
         """Fetch transactions using pagination to get full history."""
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days_back)
+        start_ms, end_ms = _to_ms(start_date), _to_ms(end_date)
 
         all_transactions = []
         seen_ids = set()  # Track transaction IDs to prevent duplicates
+        seen_ids_add = seen_ids.add
         marker = None
         max_calls = 50  # Increased from 20 to fetch more history
         call_count = 0
-        oldest_date_found = None
+        oldest_ms_found = None
         expected_total_count = None  # Track total from first response
 
-        print(f"📊 Fetching transaction history for {days_back} days (back to {start_date.strftime('%m/%d/%Y')})...")
+        logger.info("📊 Fetching transaction history for %d days (back to %s)...", days_back, start_date.strftime('%m/%d/%Y'))
 
         while call_count < max_calls:
             call_count += 1
-            print(f"🔄 API call {call_count}/{max_calls}...")
+            logger.debug("🔄 API call %d/%d...", call_count, max_calls)
 
             try:
                 # Note: E*TRADE API date parameters seem unreliable, so we fetch without them
@@ -101,7 +481,7 @@ class TransactionCache:
                 )
 
                 if 'Transaction' not in response:
-                    print(f"⚠️  No more transactions found (call {call_count})")
+                    logger.info("⚠️  No more transactions found (call %d)", call_count)
                     break
 
                 transactions = response['Transaction']
@@ -118,72 +498,77 @@ class TransactionCache:
                     if trans_id in seen_ids:
                         continue
 
-                    seen_ids.add(trans_id)
+                    seen_ids_add(trans_id)
                     new_unique_count += 1
 
-                    try:
-                        trans_date_ms = int(trans.get('transactionDate', 0))
-                        trans_date_obj = datetime.fromtimestamp(trans_date_ms / 1000)
+                    trans_date_ms = _ensure_ts(trans)
+                    if trans_date_ms is None:
+                        continue
 
-                        if oldest_date_found is None or trans_date_obj < oldest_date_found:
-                            oldest_date_found = trans_date_obj
+                    if oldest_ms_found is None or trans_date_ms < oldest_ms_found:
+                        oldest_ms_found = trans_date_ms
 
-                        # Only include transactions within date range
-                        if start_date <= trans_date_obj <= end_date:
-                            new_transactions.append(trans)
-                    except (ValueError, TypeError):
-                        continue
+                    # Only include transactions within date range
+                    if start_ms <= trans_date_ms <= end_ms:
+                        new_transactions.append(trans)
 
                 all_transactions.extend(new_transactions)
-                print(f"  ✅ Found {len(new_transactions)} transactions in range ({new_unique_count} new, {len(transactions) - new_unique_count} duplicates, total: {len(all_transactions)})")
+                logger.debug("  ✅ Found %d transactions in range (%d new, %d duplicates, total: %d)",
+                             len(new_transactions), new_unique_count, len(transactions) - new_unique_count, len(all_transactions))
 
                 # Capture expected total count from first response
                 if expected_total_count is None:
-                    expected_total_count = response.get('totalCount', 0)
+                    # Parsed once here; totalCount may arrive as a string
+                    expected_total_count = int(response.get('totalCount') or 0)
                     if expected_total_count:
-                        print(f"  📊 Total available: {expected_total_count} transactions")
+                        logger.info("  📊 Total available: %d transactions", expected_total_count)
 
                 # If we didn't get any new unique transactions, we're done
                 if new_unique_count == 0:
-                    print("📄 No new transactions found - pagination complete")
+                    logger.info("📄 No new transactions found - pagination complete")
                     break
 
                 # Check if we've fetched all available transactions based on initial totalCount
-                if expected_total_count and len(seen_ids) >= int(expected_total_count):
-                    print(f"📄 Fetched all {expected_total_count} available transactions")
+                if expected_total_count and len(seen_ids) >= expected_total_count:
+                    logger.info("📄 Fetched all %d available transactions", expected_total_count)
                     break
                 elif expected_total_count:
-                    print(f"  📊 Progress: {len(seen_ids)}/{expected_total_count} transactions")
+                    logger.debug("  📊 Progress: %d/%d transactions", len(seen_ids), expected_total_count)
                 
                 # Check if we've gone back far enough in time
-                if oldest_date_found and oldest_date_found < start_date:
-                    print(f"� Reached target date: {oldest_date_found.strftime('%m/%d/%Y')} (requested {start_date.strftime('%m/%d/%Y')})")
+                if oldest_ms_found is not None and oldest_ms_found < start_ms:
+                    oldest_date_found = datetime.fromtimestamp(oldest_ms_found / 1000)
+                    logger.info("📅 Reached target date: %s (requested %s)",
+                                oldest_date_found.strftime('%m/%d/%Y'), start_date.strftime('%m/%d/%Y'))
                     break
 
                 # Use the API's marker field if available, otherwise fall back to transaction ID
                 if 'marker' in response:
                     marker = response['marker']
-                    print(f"  📍 Using API marker: {marker}")
+                    logger.debug("  📍 Using API marker: %s", marker)
                 elif transactions:
                     marker = transactions[-1].get('transactionId')
                     if not marker:
-                        print("⚠️  No marker or transaction ID for pagination")
+                        logger.warning("⚠️  No marker or transaction ID for pagination")
                         break
                 else:
-                    print("⚠️  No transactions or marker to continue pagination")
+                    logger.warning("⚠️  No transactions or marker to continue pagination")
                     break
 
             except Exception as e:
-                print(f"❌ Error in pagination call {call_count}: {e}")
+                logger.error("❌ Error in pagination call %d: %s", call_count, e)
                 break
 
-        # Report what we actually got
-        if all_transactions and oldest_date_found:
+        # Report what we actually got, in one summary rather than per page
+        if all_transactions and oldest_ms_found:
+            oldest_date_found = datetime.fromtimestamp(oldest_ms_found / 1000)
             actual_days = (datetime.now() - oldest_date_found).days
-            print(f"✅ Fetched {len(all_transactions)} transactions from {call_count} API calls")
-            print(f"   Date range: {oldest_date_found.strftime('%m/%d/%Y')} to {datetime.now().strftime('%m/%d/%Y')} ({actual_days} days)")
+            logger.info("✅ Fetched %d transactions from %d API calls (%d seen)\n   Date range: %s to %s (%d days)",
+                        len(all_transactions), call_count, len(seen_ids),
+                        oldest_date_found.strftime('%m/%d/%Y'), datetime.now().strftime('%m/%d/%Y'), actual_days)
         else:
-            print(f"✅ Fetched {len(all_transactions)} transactions from {call_count} API calls")
+            logger.info("✅ Fetched %d transactions from %d API calls (%d seen)",
+                        len(all_transactions), call_count, len(seen_ids))
         
         return all_transactions
     
@@ -197,38 +582,44 @@ class TransactionCache:
             force_refresh: Force refresh from API
         
         Returns:
-            List of transaction dictionaries
+            List of transaction dictionaries. These are deep copies: the cached ones
+            are shared across calls (and may still be queued for writing), so
+            changes to the result, nested fields included, never reach the cache.
         """
+        transactions = self._get_transactions(account_id_key, days_back, force_refresh)
+        # A JSON round-trip is the cheapest deep copy of these plain JSON-shaped rows;
+        # '_ts' is only an in-memory sort key, so it stays out of the result
+        return orjson.loads(orjson.dumps([_without_ts(trans) for trans in transactions]))
+    
+    def _get_transactions(self, account_id_key: str, days_back: int, force_refresh: bool = False) -> List[Dict[str, Any]]:
+        """get_transactions without the copies; the result must be treated as read-only."""
         if force_refresh:
             print("🔄 Force refresh requested, fetching from API...")
             transactions = self._fetch_paginated_transactions(account_id_key, days_back)
             self._save_cache(account_id_key, transactions)
             return transactions
         
+        end_date = datetime.now()
+        start_date = (end_date - timedelta(days=days_back)).replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        # Only read the months we can return or reconcile (stale checks cover the last 2 days)
+        recent_cutoff_ms = _to_ms(datetime.now() - timedelta(days=2))
+        load_since_ms = min(_to_ms(start_date), recent_cutoff_ms)
+        
         # Load cache
-        cache_data = self._load_cache(account_id_key)
+        cache_data = self._load_cache(account_id_key, since_ms=load_since_ms)
         cached_transactions = cache_data.get('transactions', [])
         
-        if not cached_transactions:
+        if not cache_data.get('shards'):
             print("📁 No cached transactions, fetching full history...")
             transactions = self._fetch_paginated_transactions(account_id_key, days_back)
             self._save_cache(account_id_key, transactions)
             return transactions
         
-        # Check if cached data covers the requested date range
-        end_date = datetime.now()
-        start_date = (end_date - timedelta(days=days_back)).replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        # Find oldest transaction in cache
-        oldest_cached_date = None
-        for trans in cached_transactions:
-            try:
-                trans_date_ms = int(trans.get('transactionDate', 0))
-                trans_date_obj = datetime.fromtimestamp(trans_date_ms / 1000)
-                if oldest_cached_date is None or trans_date_obj < oldest_cached_date:
-                    oldest_cached_date = trans_date_obj
-            except (ValueError, TypeError):
-                continue
+        # Check if cached data covers the requested date range, using the
+        # oldest transaction across all shards (not just the ones loaded)
+        oldest_ts = cache_data.get('oldest_ts')
+        oldest_cached_date = datetime.fromtimestamp(oldest_ts / 1000) if oldest_ts is not None else None
         
         # If cache doesn't go back far enough, re-fetch with larger range
         if oldest_cached_date and oldest_cached_date > start_date:
@@ -238,36 +629,55 @@ class TransactionCache:
             self._save_cache(account_id_key, transactions)
             return transactions
         
+        # Skip the API round-trip if the cache was synced very recently
+        last_updated = cache_data.get('last_updated')
+        if last_updated:
+            age = (datetime.now() - datetime.fromisoformat(last_updated)).total_seconds()
+            if age < self.ttl_seconds:
+                print(f"✅ Cache synced {age:.0f}s ago, skipping API check")
+                return self._filter_by_date_range(cached_transactions, days_back)
+        
         # Check if we need fresh data by fetching recent transactions
         print("🔍 Checking for new transactions...")
-        recent_transactions = self._fetch_recent_transactions(account_id_key, 50)
+        recent_transactions, etag = self._fetch_recent_transactions(account_id_key, 50, cache_data.get('etag'))
+
+        if recent_transactions is None:
+            print("✅ No changes since last check, using cache")
+            self._mark_synced(account_id_key, etag)
+            return self._filter_by_date_range(cached_transactions, days_back)
 
         if not recent_transactions:
             print("⚠️  No recent transactions found, using cache")
             return self._filter_by_date_range(cached_transactions, days_back)
 
-        # Build set of current API transaction IDs
-        api_ids = {t.get('transactionId') for t in recent_transactions}
-        cached_ids = {t.get('transactionId') for t in cached_transactions}
-
-        # Find new transactions (in API but not in cache)
-        new_transactions = [t for t in recent_transactions if t.get('transactionId') not in cached_ids]
-
         # Find the oldest transaction timestamp in the API response
-        # Transactions are in reverse chronological order, so we need to find the oldest one
-        oldest_api_timestamp = None
-        for t in recent_transactions:
-            try:
-                trans_date_ms = int(t.get('transactionDate', 0))
-                if oldest_api_timestamp is None or trans_date_ms < oldest_api_timestamp:
-                    oldest_api_timestamp = trans_date_ms
-            except (ValueError, TypeError):
-                continue
+        # Transactions are in reverse chronological order, so we need to find the oldest one.
+        # Undated rows (None or 0) say nothing about how far back the response reaches
+        api_ts = [ts for ts in map(_ensure_ts, recent_transactions) if ts]
+        oldest_api_timestamp = min(api_ts) if api_ts else None
 
         if oldest_api_timestamp is None:
             print("⚠️  No valid timestamps in API response, using cache")
             return self._filter_by_date_range(cached_transactions, days_back)
 
+        # The API response may reach into months we didn't load; read those
+        # too so its transactions aren't mistaken for new ones
+        if _month_of(oldest_api_timestamp) < _month_of(load_since_ms):
+            cache_data = self._load_cache(account_id_key, since_ms=oldest_api_timestamp)
+            cached_transactions = cache_data.get('transactions', [])
+
+        # Build read-only ID sets once; they are only used for membership checks.
+        # The API response only reaches back to oldest_api_timestamp, so only cached
+        # rows at least that new (plus undated ones, which sort last) can match it
+        api_window_end = _newest_first_index(cached_transactions, oldest_api_timestamp)
+        undated_start = _newest_first_index(cached_transactions, 1)
+        api_ids = frozenset(t.get('transactionId') for t in recent_transactions)
+        cached_ids = frozenset(t.get('transactionId') for t in itertools.chain(
+            cached_transactions[:api_window_end], cached_transactions[undated_start:]))
+
+        # Find new transactions (in API but not in cache)
+        new_transactions = [t for t in recent_transactions if t.get('transactionId') not in cached_ids]
+
         oldest_api_datetime = datetime.fromtimestamp(oldest_api_timestamp / 1000)
         print(f"📅 API response goes back to {oldest_api_datetime.strftime('%m/%d/%Y %H:%M:%S')}")
 
@@ -276,90 +686,64 @@ class TransactionCache:
         # where we expect the API to have complete data (e.g., last 24-48 hours).
         # We can't assume the 50-transaction API response includes ALL transactions
         # back to oldest_api_timestamp - there could be older valid transactions.
-        stale_ids = set()
-        
+        #
         # Only check for stale transactions from the last 2 days
-        # (pending transactions typically settle within 24-48 hours)
-        recent_cutoff = datetime.now() - timedelta(days=2)
-        recent_cutoff_ms = int(recent_cutoff.timestamp() * 1000)
-
-        for t in cached_transactions:
-            try:
-                trans_date_ms = int(t.get('transactionDate', 0))
-
-                # Only reconcile very recent transactions (last 2 days)
-                # These are the ones that might be pending and could settle/change
-                if trans_date_ms >= recent_cutoff_ms:
-                    # If this recent cached transaction is not in the API response, it's stale
-                    if t.get('transactionId') not in api_ids:
-                        stale_ids.add(t.get('transactionId'))
-            except (ValueError, TypeError):
-                continue
+        # (pending transactions typically settle within 24-48 hours).
+        # The cache is newest first, so those are the rows before recent_end
+        recent_end = _newest_first_index(cached_transactions, recent_cutoff_ms)
+        # If a recent cached transaction is not in the API response, it's stale
+        stale_transactions = [t for t in cached_transactions[:recent_end]
+                              if t.get('transactionId') not in api_ids]
+        stale_ids = {t.get('transactionId') for t in stale_transactions}
 
         # Remove stale transactions from cache
         if stale_ids:
             print(f"🧹 Removing {len(stale_ids)} stale transactions (pending→settled)")
-            cached_transactions = [t for t in cached_transactions if t.get('transactionId') not in stale_ids]
-            cached_ids = {t.get('transactionId') for t in cached_transactions}
+            # Stale rows all sit in the recent window, so only that slice needs filtering
+            cached_transactions = ([t for t in cached_transactions[:recent_end] if t.get('transactionId') not in stale_ids]
+                                   + cached_transactions[recent_end:])
 
         if new_transactions or stale_ids:
             if new_transactions:
                 print(f"✨ Found {len(new_transactions)} new transactions")
-            # Merge new transactions with cleaned cache and sort by date (newest first)
-            all_transactions = new_transactions + cached_transactions
-            all_transactions = self._sort_transactions(all_transactions)
-            # Remove duplicates (shouldn't happen, but just in case)
-            all_transactions = self._deduplicate_transactions(all_transactions)
-            self._save_cache(account_id_key, all_transactions)
+            # Merge new transactions into the (already sorted) cleaned cache, newest first,
+            # removing duplicates on the way (shouldn't happen, but just in case).
+            # Only the small API batch needs sorting.
+            all_transactions = _merge_newest_first(self._sort_transactions(new_transactions),
+                                                   cached_transactions)
+            # Only rewrite the shards that gained or lost transactions
+            stale_months = {_month_of(_ensure_ts(t)) for t in stale_transactions}
+            touched_months = stale_months | {_month_of(_ensure_ts(t)) for t in new_transactions}
+            all_by_month = _split_by_month(all_transactions)
+            self._save_cache(account_id_key,
+                             [t for month in touched_months for t in all_by_month.get(month, [])],
+                             months=touched_months, etag=etag)
             return self._filter_by_date_range(all_transactions, days_back)
         else:
             print("✅ Cache is up to date")
+            self._mark_synced(account_id_key, etag)
             return self._filter_by_date_range(cached_transactions, days_back)
     
     def _filter_by_date_range(self, transactions: List[Dict[str, Any]], days_back: int) -> List[Dict[str, Any]]:
-        """Filter transactions to specified date range."""
+        """Filter newest-first transactions to specified date range."""
         end_date = datetime.now()
         # Use start of day for start_date to include all transactions on that day
         start_date = (end_date - timedelta(days=days_back)).replace(hour=0, minute=0, second=0, microsecond=0)
 
-        filtered = []
-        for trans in transactions:
-            try:
-                trans_date_ms = int(trans.get('transactionDate', 0))
-                trans_date_obj = datetime.fromtimestamp(trans_date_ms / 1000)
-                if start_date <= trans_date_obj <= end_date:
-                    filtered.append(trans)
-            except (ValueError, TypeError):
-                continue
-
-        return filtered
+        start_ms, end_ms = _to_ms(start_date), _to_ms(end_date)
+
+        # The list is sorted, so the range is one contiguous slice.
+        # Unparseable dates count as 0, which is always before start_ms
+        return transactions[_newest_first_index(transactions, end_ms + 1):_newest_first_index(transactions, start_ms)]
     
     def _sort_transactions(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Sort transactions by date (newest first)."""
-        def get_date(trans):
-            try:
-                return int(trans.get('transactionDate', 0))
-            except (ValueError, TypeError):
-                return 0
-        
-        return sorted(transactions, key=get_date, reverse=True)
-    
-    def _deduplicate_transactions(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Remove duplicate transactions based on transaction ID."""
-        seen_ids = set()
-        deduplicated = []
-        
-        for trans in transactions:
-            trans_id = trans.get('transactionId')
-            if trans_id and trans_id not in seen_ids:
-                seen_ids.add(trans_id)
-                deduplicated.append(trans)
-        
-        return deduplicated
+        return _TxnTable.from_transactions(transactions).newest_first().payloads
     
     def get_transaction_summary(self, account_id_key: str, days_back: int = 7) -> Dict[str, Any]:
         """Get summary statistics for transactions."""
-        transactions = self.get_transactions(account_id_key, days_back)
+        # Only reads the transactions, so skip the defensive copies
+        transactions = self._get_transactions(account_id_key, days_back)
         
         if not transactions:
             return {
@@ -371,40 +755,46 @@ class TransactionCache:
             }
         
         # Analyze transactions
-        transaction_types = {}
-        dates = []
+        transaction_types = Counter(trans.get('transactionType', 'Unknown') for trans in transactions)
+        timestamps = np.fromiter((_ensure_ts(trans) or 0 for trans in transactions),
+                                 dtype=np.int64, count=len(transactions))
+        timestamps = timestamps[timestamps > 0]
         
-        for trans in transactions:
-            trans_type = trans.get('transactionType', 'Unknown')
-            transaction_types[trans_type] = transaction_types.get(trans_type, 0) + 1
-            
-            try:
-                trans_date_ms = int(trans.get('transactionDate', 0))
-                trans_date_obj = datetime.fromtimestamp(trans_date_ms / 1000)
-                dates.append(trans_date_obj)
-            except (ValueError, TypeError):
-                continue
-        
-        dates.sort()
+        # Only the oldest and newest dates are reported, so convert just those two
+        has_dates = timestamps.size > 0
+        oldest_date = datetime.fromtimestamp(int(timestamps.min()) / 1000) if has_dates else None
+        newest_date = datetime.fromtimestamp(int(timestamps.max()) / 1000) if has_dates else None
         
         return {
             'total_transactions': len(transactions),
-            'date_range': f"{dates[0].strftime('%m/%d/%Y')} - {dates[-1].strftime('%m/%d/%Y')}" if dates else 'No valid dates',
-            'transaction_types': transaction_types,
-            'oldest_date': dates[0] if dates else None,
-            'newest_date': dates[-1] if dates else None
+            'date_range': f"{oldest_date.strftime('%m/%d/%Y')} - {newest_date.strftime('%m/%d/%Y')}" if has_dates else 'No valid dates',
+            'transaction_types': dict(transaction_types),
+            'oldest_date': oldest_date,
+            'newest_date': newest_date
         }
     
     def clear_cache(self, account_id_key: Optional[str] = None) -> None:
         """Clear cache for specific account or all accounts."""
+        _writer.flush()
         if account_id_key:
-            cache_file = self._get_cache_file(account_id_key)
-            if os.path.exists(cache_file):
-                os.remove(cache_file)
+            # Manifest, monthly shards and any pre-shard single file
+            if self._remove_cache_files(f"transactions_{_hash_account(account_id_key)}"):
                 print(f"✅ Cleared cache for account")
         else:
             # Clear all cache files
-            for filename in os.listdir(self.cache_dir):
-                if filename.startswith('transactions_') and filename.endswith('.json'):
-                    os.remove(os.path.join(self.cache_dir, filename))
-            print("✅ Cleared all transaction caches")
\ No newline at end of file
+            self._remove_cache_files('transactions_')
+            print("✅ Cleared all transaction caches")
+    
+    def _remove_cache_files(self, prefix: str) -> int:
+        """Remove cache files whose names start with prefix; returns how many were removed."""
+        with os.scandir(self.cache_dir) as entries:
+            paths = [entry.path for entry in entries
+                     if entry.name.startswith(prefix) and entry.name.endswith('.json')]
+        if len(paths) > 1:
+            # Overlap the unlinks, which is noticeable on networked cache directories
+            with ThreadPoolExecutor(max_workers=min(len(paths), MAX_IO_WORKERS)) as executor:
+                list(executor.map(os.remove, paths))
+        else:
+            for path in paths:
+                os.remove(path)
+        return len(paths)
\ No newline at end of file